@@ -20,18 +20,22 @@ else:
 # Platform specifics
 if sys.platform.startswith('win'):
     from . import _xlwindows as xlplatform
-else:
+elif sys.platform.startswith('darwin'):
     from . import _xlmac as xlplatform
-
-time_types = xlplatform.time_types
+else:
+    # There's no Excel, only the modules that don't need it can be used, e.g. xlwings.transport
+    xlplatform = None
 
 # Errors
 class ShapeAlreadyExists(Exception):
     pass
 
 # API
-from .main import App, Book, Range, Chart, Sheet, Picture, Shape, Name, view, RangeRows, RangeColumns
-from .main import apps, books, sheets
+if xlplatform is not None:
+    time_types = xlplatform.time_types
+
+    from .main import App, Book, Range, Chart, Sheet, Picture, Shape, Name, view, use, RangeRows, RangeColumns
+    from .main import apps, books, sheets
 
 # UDFs
 if sys.platform.startswith('win'):
@@ -4,6 +4,7 @@ import subprocess
 import unicodedata
 import struct
 import shutil
+import tempfile
 import atexit
 
 import psutil
@@ -13,7 +14,7 @@ from appscript import k as kw, mactypes, its
 from appscript.reference import CommandError
 
 from .constants import ColorIndex
-from .utils import int_to_rgb, np_datetime_to_datetime, col_name, VersionNumber
+from .utils import int_to_rgb, np_datetime_to_datetime, col_name, VersionNumber, cell_address, address_to_coords
 from . import mac_dict, PY3, string_types
 
 try:
@@ -52,6 +53,13 @@ class Apps(object):
         pids = list(self._iter_excel_instances())
         return App(xl=pids[index])
 
+    def refresh(self):
+        # The instances are looked up on every access
+        pass
+
+
+apps = Apps()
+
 
 class App(object):
 
@@ -323,7 +331,7 @@ class Sheet(object):
                     raise IndexError("Attempted to access 0-based Range. xlwings/Excel Ranges are 1-based.")
                 row1 = arg1[0]
                 col1 = arg1[1]
-                address1 = self.xl.rows[row1].columns[col1].get_address()
+                address1 = cell_address(row1, col1)
             elif len(arg1) == 4:
                 return Range(self, arg1)
             else:
@@ -331,7 +339,7 @@ class Sheet(object):
         elif isinstance(arg1, Range):
             row1 = min(arg1.row, arg2.row)
             col1 = min(arg1.column, arg2.column)
-            address1 = self.xl.rows[row1].columns[col1].get_address()
+            address1 = cell_address(row1, col1)
         elif isinstance(arg1, string_types):
             address1 = arg1.split(':')[0]
         else:
@@ -342,11 +350,11 @@ class Sheet(object):
                 raise IndexError("Attempted to access 0-based Range. xlwings/Excel Ranges are 1-based.")
             row2 = arg2[0]
             col2 = arg2[1]
-            address2 = self.xl.rows[row2].columns[col2].get_address()
+            address2 = cell_address(row2, col2)
         elif isinstance(arg2, Range):
             row2 = max(arg1.row + arg1.shape[0] - 1, arg2.row + arg2.shape[0] - 1)
             col2 = max(arg1.column + arg1.shape[1] - 1, arg2.column + arg2.shape[1] - 1)
-            address2 = self.xl.rows[row2].columns[col2].get_address()
+            address2 = cell_address(row2, col2)
         elif isinstance(arg2, string_types):
             address2 = arg2
         elif arg2 is None:
@@ -363,6 +371,10 @@ class Sheet(object):
     def cells(self):
         return self.range((1, 1), (self.xl.count(each=kw.row), self.xl.count(each=kw.column)))
 
+    @property
+    def used_range(self):
+        return Range(self, self.xl.used_range.get_address())
+
     def activate(self):
         self.xl.activate_object()
 
@@ -417,25 +429,30 @@ class Range(object):
             self._coords = address
             row, col, nrows, ncols = address
             if nrows and ncols:
+                # Addresses are built locally as every AppleEvent takes milliseconds
                 self.xl = sheet.xl.cells["%s:%s" % (
-                    sheet.xl.rows[row].columns[col].get_address(),
-                    sheet.xl.rows[row+nrows-1].columns[col+ncols-1].get_address(),
+                    cell_address(row, col),
+                    cell_address(row + nrows - 1, col + ncols - 1),
                 )]
             else:
                 self.xl = None
         else:
             self.xl = sheet.xl.cells[address]
-            self._coords = None
+            self._coords = address_to_coords(address)
 
     @property
     def coords(self):
         if self._coords is None:
-            self._coords = (
-                self.xl.first_row_index.get(),
-                self.xl.first_column_index.get(),
-                self.xl.count(each=kw.row),
-                self.xl.count(each=kw.column)
-            )
+            # Names etc. are resolved with a single AppleEvent, only entire rows/columns and ranges with several areas
+            # need to ask for every coordinate
+            self._coords = address_to_coords(self.xl.get_address())
+            if self._coords is None:
+                self._coords = (
+                    self.xl.first_row_index.get(),
+                    self.xl.first_column_index.get(),
+                    self.xl.count(each=kw.row),
+                    self.xl.count(each=kw.column)
+                )
         return self._coords
 
     @property
@@ -645,8 +662,7 @@ class Range(object):
             row = int((arg1 - 1 - col) / self.shape[1])
             return self(1 + row, 1 + col)
         else:
-            return Range(self.sheet,
-                         self.sheet.xl.rows[self.row + arg1 - 1].columns[self.column + arg2 - 1].get_address())
+            return Range(self.sheet, (self.row + arg1 - 1, self.column + arg2 - 1, 1, 1))
 
     @property
     def rows(self):
@@ -930,6 +946,14 @@ class Picture(object):
     def height(self, value):
         self.xl.height.set(value)
 
+    @property
+    def alternative_text(self):
+        return self.xl.alternative_text.get()
+
+    @alternative_text.setter
+    def alternative_text(self, value):
+        self.xl.alternative_text.set(value)
+
     def delete(self):
         self.xl.delete()
 
@@ -946,7 +970,11 @@ class Pictures(Collection):
 
         if not link_to_file and version >= 15:
             # Office 2016 for Mac is sandboxed. This path seems to work without the need of granting access explicitly
-            xlwings_picture = os.path.expanduser("~") + '/Library/Containers/com.microsoft.Excel/Data/xlwings_picture.png'
+            fd, xlwings_picture = tempfile.mkstemp(
+                prefix='xlwings-', suffix=os.path.splitext(filename)[1],
+                dir=os.path.expanduser("~") + '/Library/Containers/com.microsoft.Excel/Data'
+            )
+            os.close(fd)
             shutil.copy2(filename, xlwings_picture)
             filename = xlwings_picture
 
@@ -1005,6 +1033,21 @@ class Names(object):
                                                      kw.name: name
                                                  }))
 
+    def to_dict(self):
+        # One AppleEvent per property for all names
+        names = self.xl.name.get()
+        if names == kw.missing_value:
+            return {}
+        return dict(zip(names, self.xl.references.get()))
+
+    def update(self, mapping):
+        existing = set(self.to_dict())
+        for name, refers_to in mapping.items():
+            if name in existing:
+                self.xl[name].properties(kw.references).set(refers_to)
+            else:
+                self.add(name, refers_to)
+
 
 class Name(object):
     def __init__(self, book, xl):
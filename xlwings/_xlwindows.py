@@ -11,6 +11,7 @@ import win32api
 os.chdir(cwd)
 
 from warnings import warn
+from timeit import default_timer
 import datetime as dt
 import numbers
 import types
@@ -267,16 +268,56 @@ def is_range_instance(xl_range):
 
 class Apps(object):
 
+    # Seconds after which the desktop's window list is walked again, so Excel instances that were started or brought
+    # to the front outside of xlwings are picked up without calling refresh()
+    max_age = 1.
+
+    def __init__(self):
+        self._hwnds = []
+        self._apps = {}  # hwnd -> (pid, App)
+        self._last_refresh = None
+
+    def refresh(self):
+        """Walks the window list to find the Excel instances, keeping the App objects of known instances."""
+        hwnds = list(get_excel_hwnds())
+        apps = {}
+        for hwnd in hwnds:
+            pid = win32process.GetWindowThreadProcessId(hwnd)[1]
+            known = self._apps.get(hwnd, None)
+            apps[hwnd] = known if known is not None and known[0] == pid else (pid, App(xl=hwnd))
+        self._hwnds, self._apps = hwnds, apps
+        self._last_refresh = default_timer()
+
+    def invalidate(self):
+        self._last_refresh = None
+
+    def _is_alive(self, hwnd):
+        # Window handles are reused by Windows, so the window must still belong to the same process
+        try:
+            return (windll.user32.IsWindow(hwnd)
+                    and win32process.GetWindowThreadProcessId(hwnd)[1] == self._apps[hwnd][0])
+        except pywintypes.error:
+            return False
+
+    def _get_hwnds(self):
+        if (self._last_refresh is None or default_timer() - self._last_refresh > self.max_age
+                or not all(self._is_alive(hwnd) for hwnd in self._hwnds)):
+            self.refresh()
+        return self._hwnds
+
     def __iter__(self):
-        for hwnd in get_excel_hwnds():
-            yield App(xl=hwnd)
+        # _get_hwnds() may refresh, which replaces self._apps
+        hwnds = self._get_hwnds()
+        apps = self._apps
+        for hwnd in hwnds:
+            yield apps[hwnd][1]
 
     def __len__(self):
-        return len(list(get_excel_hwnds()))
+        return len(self._get_hwnds())
 
     def __getitem__(self, index):
-        hwnds = list(get_excel_hwnds())
-        return App(xl=hwnds[index])
+        hwnds = self._get_hwnds()
+        return self._apps[hwnds[index]][1]
 
 
 class App(object):
@@ -290,6 +331,7 @@ class App(object):
             if add_book:
                 self._xl.Workbooks.Add()
             self._hwnd = None
+            apps.invalidate()
         elif isinstance(xl, int):
             self._xl = None
             self._hwnd = xl
@@ -319,6 +361,7 @@ class App(object):
             windll.user32.SetForegroundWindow(self.xl.Hwnd)
         else:
             windll.user32.SetWindowPos(self.xl.Hwnd, hwnd, 0, 0, 0, 0, 0x1 | 0x2 | 0x10)
+        apps.invalidate()
 
     @property
     def visible(self):
@@ -331,6 +374,7 @@ class App(object):
     def quit(self):
         self.xl.DisplayAlerts = False
         self.xl.Quit()
+        apps.invalidate()
 
     def kill(self):
         import win32api
@@ -338,6 +382,7 @@ class App(object):
         handle = win32api.OpenProcess(PROCESS_TERMINATE, False, self.pid)
         win32api.TerminateProcess(handle, -1)
         win32api.CloseHandle(handle)
+        apps.invalidate()
 
     @property
     def screen_updating(self):
@@ -404,6 +449,9 @@ class App(object):
         return self.xl.Run(macro, *args)
 
 
+apps = Apps()
+
+
 class Books(object):
 
     def __init__(self, xl):
@@ -601,6 +649,10 @@ class Sheet(object):
     def cells(self):
         return Range(xl=self.xl.Cells)
 
+    @property
+    def used_range(self):
+        return Range(xl=self.xl.UsedRange)
+
     def activate(self):
         return self.xl.Activate()
 
@@ -1300,6 +1352,14 @@ class Picture(object):
     def height(self, value):
         self.xl.Height = value
 
+    @property
+    def alternative_text(self):
+        return self.xl.AlternativeText
+
+    @alternative_text.setter
+    def alternative_text(self, value):
+        self.xl.AlternativeText = value
+
     def delete(self):
         self.xl.Delete()
 
@@ -1351,6 +1411,15 @@ class Names(object):
     def add(self, name, refers_to):
         return Name(xl=self.xl.Add(name, refers_to))
 
+    def to_dict(self):
+        # Enumerating the collection saves the lookup of every item by its index
+        return dict((xl.Name, xl.RefersTo) for xl in self.xl)
+
+    def update(self, mapping):
+        # Names.Add replaces the definition of an existing name
+        for name, refers_to in mapping.items():
+            self.xl.Add(name, refers_to)
+
 
 class Name(object):
     def __init__(self, xl):
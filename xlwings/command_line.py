@@ -176,6 +176,25 @@ def runpython_install(args):
     print('Successfully installed RunPython for Mac Excel 2016!')
 
 
+def runpython_serve(args):
+    from xlwings.runpython import serve
+    serve(args.port)
+
+
+def udf_manifest(args):
+    if not sys.platform.startswith('win'):
+        print('Error: This command is only available on Windows right now.')
+    else:
+        from xlwings.udfs import write_udf_manifest
+        # Same as the PYTHONPATH default in the VBA settings, which is the workbook's directory
+        sys.path.insert(0, os.getcwd())
+        for module_name in args.modules:
+            try:
+                print('Wrote {}'.format(write_udf_manifest(module_name)))
+            except Exception as e:
+                print('Error: Could not write the manifest of {}: {}'.format(module_name, str(e)))
+
+
 def main():
     parser = argparse.ArgumentParser()
     subparsers = parser.add_subparsers(dest='command')
@@ -232,12 +251,26 @@ def main():
     quickstart_parser.add_argument("project_name")
     quickstart_parser.set_defaults(func=quickstart)
 
-    # RunPython (only needed when installed with conda for Mac Excel 2016)
-    if sys.platform.startswith('darwin'):
-        runpython_parser = subparsers.add_parser('runpython', help='Run this if you installed xlwings via conda and are using Mac Excel 2016')
-        runpython_subparser = runpython_parser.add_subparsers(dest='subcommand')
-        runpython_subparser.required = True
+    # UDFs
+    udf_parser = subparsers.add_parser('udf', help='User Defined Functions')
+    udf_subparsers = udf_parser.add_subparsers(dest='subcommand')
+    udf_subparsers.required = True
+
+    udf_manifest_parser = udf_subparsers.add_parser('manifest')
+    udf_manifest_parser.add_argument("modules", nargs='+')
+    udf_manifest_parser.set_defaults(func=udf_manifest)
 
+    # RunPython
+    runpython_parser = subparsers.add_parser('runpython', help='RunPython daemon and Mac Excel 2016 setup')
+    runpython_subparser = runpython_parser.add_subparsers(dest='subcommand')
+    runpython_subparser.required = True
+
+    runpython_serve_parser = runpython_subparser.add_parser('serve')
+    runpython_serve_parser.add_argument("--port", type=int, default=0)
+    runpython_serve_parser.set_defaults(func=runpython_serve)
+
+    # Only needed when installed with conda for Mac Excel 2016
+    if sys.platform.startswith('darwin'):
         runpython_install_parser = runpython_subparser.add_parser('install')
         runpython_install_parser.set_defaults(func=runpython_install)
 
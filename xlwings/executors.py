@@ -0,0 +1,376 @@
+"""
+Executors that run the body of a UDF outside of the thread that serves Excel.
+
+A UDF opts in via ``@xw.func(executor='process')``. The arguments have already been converted on the server side,
+they are pickled to a worker process together with the module and function name. The worker imports the UDF module
+itself (reloading it whenever the source file changes, exactly like the server does) and sends the pickled result
+back.
+
+The server's thread keeps pumping messages while it waits for a worker, so calls that arrive in the meantime are
+served and can run on the other workers.
+
+With ``@xw.func(executor='thread')``, the function body runs in a pool of COM-initialized worker threads while the
+server's thread keeps pumping messages.
+
+UDFs with a ``timeout`` are stopped at the deadline: a worker process is killed and replaced, a function that runs in
+the server process is run in a dedicated thread that is cancelled by raising an exception in it.
+"""
+import ctypes
+import threading
+import multiprocessing
+
+from . import PY3
+
+if PY3:
+    import queue
+else:
+    import Queue as queue
+
+# Heavy modules that are imported by every worker upfront so that the first call doesn't pay for them
+PRELOAD_MODULES = ['numpy', 'pandas']
+
+
+class WorkerCrashed(Exception):
+    pass
+
+
+class WorkerTimeout(Exception):
+    pass
+
+
+class UDFTimeout(Exception):
+    def __init__(self, func_name, timeout):
+        super(UDFTimeout, self).__init__("'%s' did not finish within %s seconds" % (func_name, timeout))
+
+
+def cancel_thread(thread, exc_type):
+    """
+    Raises ``exc_type`` in ``thread``. This takes effect as soon as the thread executes Python code again, i.e. a
+    thread that is blocked in a C extension is only cancelled once the call returns.
+    """
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread.ident), ctypes.py_object(exc_type))
+
+
+def run_cancellable(task):
+    # Target of the dedicated threads of tasks that may be cancelled
+    try:
+        task.run()
+    except WorkerTimeout:
+        # the cancellation arrived just as the function returned
+        pass
+
+
+def call_with_timeout(func, args, timeout):
+    """Calls ``func(*args)`` in a dedicated thread and raises ``UDFTimeout`` if it doesn't return within ``timeout``."""
+    task = ThreadTask(func, args)
+    thread = threading.Thread(target=run_cancellable, args=(task,))
+    thread.daemon = True
+    thread.start()
+    thread.join(timeout)
+    if not task.done():
+        task.cancel()
+        raise UDFTimeout(func.__name__, timeout)
+    return task.result()
+
+
+def _worker_main(conn, module_names):
+    # Entry point of the worker processes
+    from .udfs import get_udf_module
+
+    for module_name in PRELOAD_MODULES:
+        try:
+            __import__(module_name)
+        except ImportError:
+            pass
+    for module_name in module_names:
+        try:
+            get_udf_module(module_name)
+        except Exception:
+            # The error will be reported properly once the function is called
+            pass
+
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, IOError):
+            break
+        if msg is None:
+            break
+        module_name, func_name, args = msg
+        try:
+            func = getattr(get_udf_module(module_name), func_name)
+            response = (True, func(*args))
+        except Exception as e:
+            response = (False, "%s: %s" % (e.__class__.__name__, e))
+        try:
+            conn.send(response)
+        except Exception as e:
+            # most likely the return value can't be pickled
+            conn.send((False, "Could not send the result back to the server: %s" % e))
+
+
+class ProcessWorker(object):
+
+    def __init__(self, module_names):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_main, args=(child_conn, list(module_names)))
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+
+    def call(self, module_name, func_name, args, timeout=None):
+        try:
+            self.conn.send((module_name, func_name, args))
+            if timeout is not None and not self.conn.poll(timeout):
+                raise WorkerTimeout()
+            ok, value = self.conn.recv()
+        except (EOFError, IOError):
+            raise WorkerCrashed()
+        if not ok:
+            raise Exception(value)
+        return value
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def terminate(self):
+        try:
+            self.conn.close()
+        except (EOFError, IOError):
+            pass
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+
+
+class ProcessExecutor(object):
+    """
+    A persistent pool of pre-warmed worker processes. Workers are started eagerly so they are ready (with NumPy,
+    pandas and the known UDF modules imported) by the time the first function is called. A worker that dies while
+    running a function is replaced by a fresh one.
+    """
+
+    def __init__(self, n_workers=None):
+        self.n_workers = n_workers or multiprocessing.cpu_count()
+        self.module_names = set()
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(self.n_workers)
+
+    def _spawn(self):
+        return ProcessWorker(self.module_names)
+
+    def warm_up(self, module_name=None):
+        """Makes sure all workers are running and have ``module_name`` imported."""
+        with self._lock:
+            if module_name is not None and module_name not in self.module_names:
+                self.module_names.add(module_name)
+                # workers that are already running import the module lazily on their first call
+            while len(self._idle) < self.n_workers:
+                self._idle.append(self._spawn())
+
+    def _checkout(self):
+        self._slots.acquire()
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.is_alive():
+                    return worker
+                worker.terminate()
+        try:
+            return self._spawn()
+        except:
+            self._slots.release()
+            raise
+
+    def _checkin(self, worker):
+        with self._lock:
+            self._idle.append(worker)
+        self._slots.release()
+
+    def _replace(self):
+        # Starts a worker in the background to make up for one that has been killed
+        def target():
+            worker = self._spawn()
+            with self._lock:
+                self._idle.append(worker)
+        thread = threading.Thread(target=target)
+        thread.daemon = True
+        thread.start()
+
+    def call(self, module_name, func_name, args, timeout=None):
+        if module_name not in self.module_names:
+            self.warm_up(module_name)
+        worker = self._checkout()
+        try:
+            value = worker.call(module_name, func_name, args, timeout)
+        except WorkerCrashed:
+            worker.terminate()
+            self._slots.release()
+            raise Exception("The worker process crashed while running '%s.%s'" % (module_name, func_name))
+        except WorkerTimeout:
+            worker.terminate()
+            self._slots.release()
+            self._replace()
+            raise UDFTimeout(func_name, timeout)
+        except:
+            self._checkin(worker)
+            raise
+        self._checkin(worker)
+        return value
+
+    def submit(self, module_name, func_name, args, timeout=None):
+        """
+        Runs ``call`` in a new thread and returns its ``ThreadTask``, so that the server's thread can keep pumping
+        messages while it waits for the worker.
+        """
+        task = ThreadTask(self.call, (module_name, func_name, args, timeout))
+        thread = threading.Thread(target=task.run)
+        thread.daemon = True
+        thread.start()
+        return task
+
+    def shutdown(self):
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            try:
+                worker.conn.send(None)
+            except (EOFError, IOError):
+                pass
+            worker.terminate()
+
+
+class ThreadTask(object):
+
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+        self.value = None
+        self.error = None
+        self.thread = None
+        self._done = False
+        self._cancelled = False
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def run(self):
+        with self._lock:
+            cancelled = self._cancelled
+            if not cancelled:
+                self.thread = threading.current_thread()
+        if cancelled:
+            # cancelled before it started, e.g. while it was waiting for a free thread
+            self.error = WorkerTimeout()
+        else:
+            try:
+                self.value = self.func(*self.args)
+            except BaseException as e:
+                self.error = e
+        with self._lock:
+            self.thread = None
+            self._done = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def done(self):
+        return self._done
+
+    def add_done_callback(self, callback):
+        with self._lock:
+            if not self._done:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def cancel(self):
+        # The exception is only raised while the function runs, i.e. not in a thread that has moved on already
+        with self._lock:
+            self._cancelled = True
+            if self.thread is not None and not self._done:
+                cancel_thread(self.thread, WorkerTimeout)
+
+    def result(self):
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class ThreadExecutor(object):
+    """
+    A pool of worker threads that are initialized for COM (in the multi-threaded apartment). Threads are started on
+    demand, up to ``n_workers``. As the Excel objects of a call belong to the server's thread, functions that run here
+    shouldn't access them. Tasks that may be cancelled run in a dedicated thread instead, so that the exception that
+    cancels them can't hit a pool thread that has moved on to the next task.
+    """
+
+    def __init__(self, n_workers=4):
+        self.n_workers = n_workers
+        self.threads = []
+        self.tasks = queue.Queue()
+        self._lock = threading.Lock()
+        self._busy = 0
+
+    def _worker(self):
+        import pythoncom
+        pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)
+        try:
+            while True:
+                task = self.tasks.get()
+                if task is None:
+                    break
+                try:
+                    run_cancellable(task)
+                finally:
+                    # the thread is free again, even if the task failed or was cancelled
+                    with self._lock:
+                        self._busy -= 1
+        finally:
+            with self._lock:
+                if threading.current_thread() in self.threads:
+                    self.threads.remove(threading.current_thread())
+            pythoncom.CoUninitialize()
+
+    def _run_dedicated(self, task):
+        import pythoncom
+        pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)
+        try:
+            run_cancellable(task)
+        finally:
+            pythoncom.CoUninitialize()
+
+    def submit(self, func, args, cancellable=False):
+        task = ThreadTask(func, args)
+        if cancellable:
+            thread = threading.Thread(target=self._run_dedicated, args=(task,))
+            thread.daemon = True
+            thread.start()
+            return task
+        with self._lock:
+            self._busy += 1
+            if self._busy > len(self.threads) and len(self.threads) < self.n_workers:
+                thread = threading.Thread(target=self._worker)
+                thread.daemon = True
+                thread.start()
+                self.threads.append(thread)
+        self.tasks.put(task)
+        return task
+
+    def shutdown(self):
+        with self._lock:
+            threads, self.threads = self.threads, []
+        for _ in threads:
+            self.tasks.put(None)
+
+
+thread_executor = ThreadExecutor()
+
+_process_executor = None
+
+
+def get_process_executor():
+    global _process_executor
+    if _process_executor is None:
+        _process_executor = ProcessExecutor()
+    return _process_executor
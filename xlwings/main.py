@@ -14,6 +14,8 @@ import sys
 import re
 import numbers
 import inspect
+import threading
+from contextlib import contextmanager
 
 from . import xlplatform, string_types, ShapeAlreadyExists, PY3
 from .utils import VersionNumber
@@ -33,8 +35,37 @@ except ImportError:
     Image = None
 
 
+# Changes whenever objects are added, deleted or renamed through xlwings, which invalidates the cached names of the
+# collections, see Collection.cache_names()
+collections_version = 0
+
+
+def collections_changed():
+    global collections_version
+    collections_version += 1
+
+
+class NameIndex(object):
+    """Maps the lower case names of the objects in a collection to their 1-based index."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.version = None
+        self.indices = {}
+
+    def get(self, name):
+        if self.version != collections_version:
+            self.indices = {}
+            for i, obj in enumerate(self.collection):
+                self.indices.setdefault(obj.name.lower(), i + 1)
+            self.version = collections_version
+        return self.indices.get(name.lower(), None)
+
+
 class Collection(object):
 
+    _name_index = None
+
     def __init__(self, impl):
         self.impl = impl
 
@@ -45,7 +76,30 @@ class Collection(object):
         """
         return self.impl.api
 
+    def cache_names(self):
+        """
+        Looks up objects by name in a cached map of the names instead of asking Excel for every lookup or ``in``
+        check. The map is built with one pass over the collection the first time it's needed and again whenever
+        objects have been added, deleted or renamed through xlwings. Changes made in Excel itself are not noticed.
+        Returns the collection, or for ``xw.books`` and ``xw.sheets``, the books of the active app and the sheets of
+        the active book at the time of the call:
+
+        >>> import xlwings as xw
+        >>> shapes = xw.books['Book1'].sheets[0].shapes.cache_names()
+        >>> [name for name in ['Rectangle 1', 'Oval 1'] if name in shapes]
+        ['Rectangle 1']
+
+        .. versionadded:: 0.10.1
+        """
+        self._name_index = NameIndex(self)
+        return self
+
     def __call__(self, name_or_index):
+        if self._name_index is not None and isinstance(name_or_index, string_types):
+            index = self._name_index.get(name_or_index)
+            if index is None:
+                raise KeyError(name_or_index)
+            name_or_index = index
         return self._wrap(impl=self.impl(name_or_index))
 
     def __len__(self):
@@ -78,6 +132,8 @@ class Collection(object):
             return self(key)
 
     def __contains__(self, key):
+        if self._name_index is not None and isinstance(key, string_types):
+            return self._name_index.get(key) is not None
         return key in self.impl
 
     # used by repr - by default the name of the collection class, but can be overridden
@@ -157,8 +213,18 @@ class Apps(object):
         for app in self.impl:
             yield App(impl=app)
 
+    def refresh(self):
+        """
+        Looks up the running Excel instances again. On Windows, the instances are cached for up to a second, so
+        call this method to pick up an instance that has just been started or activated outside of xlwings.
+        Instances started, activated or quit via xlwings are picked up without it.
+
+        .. versionadded:: 0.10.1
+        """
+        self.impl.refresh()
+
 
-apps = Apps(impl=xlplatform.Apps())
+apps = Apps(impl=xlplatform.apps)
 
 
 class App(object):
@@ -462,6 +528,8 @@ class Book(object):
 
     """
 
+    _optimized_caller = None
+
     def __init__(self, fullname=None, impl=None):
         if not impl:
             if fullname:
@@ -551,8 +619,11 @@ class Book(object):
                         fullname = fullname.decode('utf-8')
                 return cls(impl=Book(fullname).impl)
         elif xlplatform.BOOK_CALLER:
-            # Called via OPTIMIZED_CONNECTION = True
-            return cls(impl=xlplatform.Book(xlplatform.BOOK_CALLER))
+            # Called via OPTIMIZED_CONNECTION = True: reuse the Book as long as the caller doesn't change
+            caller = Book._optimized_caller
+            if caller is None or caller.impl.xl is not xlplatform.BOOK_CALLER:
+                caller = Book._optimized_caller = cls(impl=xlplatform.Book(xlplatform.BOOK_CALLER))
+            return caller
         else:
             raise Exception('Workbook.caller() must not be called directly. Call through Excel or set a mock caller '
                             'first with Book.set_mock_caller().')
@@ -667,6 +738,7 @@ class Book(object):
         .. versionadded:: 0.1.1
         """
         self.impl.close()
+        collections_changed()
 
     def save(self, path=None):
         """
@@ -784,6 +856,7 @@ class Sheet(object):
     @name.setter
     def name(self, value):
         self.impl.name = value
+        collections_changed()
 
     @property
     def names(self):
@@ -832,6 +905,15 @@ class Sheet(object):
         """
         return Range(impl=self.impl.cells)
 
+    @property
+    def used_range(self):
+        """
+        Returns a Range object that represents the used range of the Sheet.
+
+        .. versionadded:: 0.10.1
+        """
+        return Range(impl=self.impl.used_range)
+
     def activate(self):
         """Activates the Sheet and returns it."""
         self.book.activate()
@@ -853,7 +935,7 @@ class Sheet(object):
         """Clears the content and formatting of the whole sheet."""
         return self.impl.clear()
 
-    def autofit(self, axis=None):
+    def autofit(self, axis=None, method='excel'):
         """
         Autofits the width of either columns, rows or both on a whole Sheet.
 
@@ -864,6 +946,12 @@ class Sheet(object):
             - To autofit columns, use one of the following: ``columns`` or ``c``
             - To autofit rows and columns, provide no arguments
 
+        method : string, default 'excel'
+            - ``excel``: Excel's AutoFit
+            - ``estimate``: Computes the widths of the columns of the used range in Python from their values, number
+              formats and the widths of the characters in the default font. This is much faster on large sheets,
+              but ignores fonts that are set on the cells. Row heights are left unchanged.
+
         Examples
         --------
         >>> import xlwings as xw
@@ -871,9 +959,17 @@ class Sheet(object):
         >>> wb.sheets['Sheet1'].autofit('c')
         >>> wb.sheets['Sheet1'].autofit('r')
         >>> wb.sheets['Sheet1'].autofit()
+        >>> wb.sheets['Sheet1'].autofit(method='estimate')
 
         .. versionadded:: 0.2.3
+
+        .. versionchanged:: 0.10.1
+            Added ``method``.
         """
+        if method == 'estimate':
+            if axis in ('rows', 'r'):
+                raise ValueError("Row heights can't be estimated, use method='excel'")
+            return self.used_range.columns.autofit(method)
         return self.impl.autofit(axis)
 
     def delete(self):
@@ -882,6 +978,7 @@ class Sheet(object):
 
         .. versionadded: 0.6.0
         """
+        collections_changed()
         return self.impl.delete()
 
     def __repr__(self):
@@ -969,7 +1066,11 @@ class Range(object):
                     raise ValueError("Ranges are not on the same sheet")
                 impl = cell1.sheet.range(cell1, cell2).impl
             elif cell2 is None and isinstance(cell1, string_types):
-                impl = apps.active.range(cell1).impl
+                pinned = _get_pinned()
+                if pinned is None:
+                    impl = apps.active.range(cell1).impl
+                else:
+                    impl = pinned[0].range(cell1).impl
             elif cell2 is None and isinstance(cell1, tuple):
                 impl = sheets.active.range(cell1, cell2).impl
             elif cell2 is not None and isinstance(cell1, tuple) and isinstance(cell2, tuple):
@@ -1386,15 +1487,25 @@ class Range(object):
 
         return Range(impl=self.impl.current_region)
 
-    def autofit(self):
+    def autofit(self, method='excel'):
         """
         Autofits the width and height of all cells in the range.
 
         * To autofit only the width of the columns use ``xw.Range('A1:B2').columns.autofit()``
         * To autofit only the height of the rows use ``xw.Range('A1:B2').rows.autofit()``
 
-        .. versionchanged:: 0.9.0
+        Arguments
+        ---------
+        method : string, default 'excel'
+            - ``excel``: Excel's AutoFit
+            - ``estimate``: Computes the widths of the columns in Python instead, which is much faster for large
+              ranges. Row heights are left unchanged, see :meth:`RangeColumns.autofit`.
+
+        .. versionchanged:: 0.10.1
+            Added ``method``.
         """
+        if method == 'estimate':
+            return self.columns.autofit(method)
         return self.impl.autofit()
 
     @property
@@ -1441,6 +1552,7 @@ class Range(object):
     @name.setter
     def name(self, value):
         self.impl.name = value
+        collections_changed()
 
     def __call__(self, *args):
         return Range(impl=self.impl(*args))
@@ -1837,11 +1949,40 @@ class RangeColumns(Ranges):
 
     count = property(__len__)
 
-    def autofit(self):
+    def autofit(self, method='excel'):
         """
         Autofits the width of the columns.
-        """
-        self.rng.impl.autofit(axis='c')
+
+        Arguments
+        ---------
+        method : string, default 'excel'
+            - ``excel``: Excel's AutoFit
+            - ``estimate``: Computes the widths in Python from the values of the range, the number formats of its
+              columns and the widths of the characters in the default font. This reads the values with a single
+              call and sets the widths once per group of adjacent columns with the same width, so it's much faster
+              for large ranges, but it ignores fonts that are set on the cells.
+
+        .. versionchanged:: 0.10.1
+            Added ``method``.
+        """
+        if method == 'estimate':
+            rng = self.rng
+            values = rng.options(ndim=2).value
+            widths = [
+                utils.estimate_column_width([row[j] for row in values], rng[:, j].number_format)
+                for j in range(rng.shape[1])
+            ]
+            start = 0
+            for j in range(1, len(widths) + 1):
+                if j == len(widths) or widths[j] != widths[start]:
+                    # columns without values keep their width
+                    if widths[start] is not None:
+                        rng[:, start:j].column_width = widths[start]
+                    start = j
+        elif method == 'excel':
+            self.rng.impl.autofit(axis='c')
+        else:
+            raise ValueError("method must be 'excel' or 'estimate'")
 
     def __iter__(self):
         for j in range(0, self.rng.shape[1]):
@@ -1899,6 +2040,7 @@ class Shape(object):
     @name.setter
     def name(self, value):
         self.impl.name = value
+        collections_changed()
 
     @property
     def type(self):
@@ -1968,6 +2110,7 @@ class Shape(object):
         .. versionadded:: 0.5.0
         """
         self.impl.delete()
+        collections_changed()
 
     def activate(self):
         """
@@ -2053,6 +2196,7 @@ class Chart(object):
     @name.setter
     def name(self, value):
         self.impl.name = value
+        collections_changed()
 
     @property
     def parent(self):
@@ -2140,6 +2284,7 @@ class Chart(object):
         Deletes the chart.
         """
         self.impl.delete()
+        collections_changed()
 
     def __repr__(self):
         return "<Chart '{0}' in {1}>".format(
@@ -2196,6 +2341,7 @@ class Charts(Collection):
         'Chart1'
         """
 
+        collections_changed()
         impl = self.impl.add(
             left,
             top,
@@ -2256,6 +2402,7 @@ class Picture(object):
                 raise ShapeAlreadyExists()
 
         self.impl.name = value
+        collections_changed()
 
     @property
     def left(self):
@@ -2316,6 +2463,7 @@ class Picture(object):
         .. versionadded:: 0.5.0
         """
         self.impl.delete()
+        collections_changed()
 
     def __eq__(self, other):
         return (
@@ -2335,7 +2483,8 @@ class Picture(object):
 
     def update(self, image):
         """
-        Replaces an existing picture with a new one, taking over the attributes of the existing picture.
+        Replaces an existing picture with a new one, taking over the attributes of the existing picture. If the
+        picture already shows the same image, it is left untouched.
 
         Arguments
         ---------
@@ -2347,13 +2496,35 @@ class Picture(object):
         .. versionadded:: 0.5.0
         """
 
-        filename, width, height = utils.process_image(image, self.width, self.height)
+        filename, data, _, _ = utils.process_image(image, None, None)
+        return self._update_image(filename, data, utils.get_image_digest(filename, data))
+
+    @property
+    def _digest(self):
+        # The digest is kept on the picture itself so it follows renames, copies and saved workbooks and is gone
+        # once the picture is replaced in Excel
+        try:
+            text = self.impl.alternative_text
+        except Exception:
+            return None
+        if text and text.startswith(IMAGE_DIGEST_PREFIX):
+            return text[len(IMAGE_DIGEST_PREFIX):]
+        return None
 
-        left, top = self.left, self.top
+    @_digest.setter
+    def _digest(self, value):
+        self.impl.alternative_text = IMAGE_DIGEST_PREFIX + value
+
+    def _update_image(self, filename, data, digest):
+        sheet = self.parent
         name = self.name
+        if self._digest == digest:
+            return self
+
+        left, top, width, height = self.left, self.top, self.width, self.height
 
         # todo: link_to_file, save_with_document
-        picture = self.parent.pictures.add(filename, left=left, top=top, width=width, height=height)
+        picture = sheet.pictures._add_image(filename, data, digest, False, True, left, top, width, height, None)
         self.delete()
 
         picture.name = name
@@ -2441,39 +2612,117 @@ class Pictures(Collection):
                 except KeyError:
                     pass
 
-        filename, width, height = utils.process_image(image, width, height)
-
         if not (link_to_file or save_with_document):
             raise Exception("Arguments link_to_file and save_with_document cannot both be false")
 
-        # Image dimensions
-        im_width, im_height = None, None
-        if width is None or height is None:
-            if Image:
-                with Image.open(filename) as im:
-                    im_width, im_height = im.size
+        filename, data, width, height = utils.process_image(image, width, height)
+        digest = utils.get_image_digest(filename, data)
 
-        if width is None:
-            if im_width is not None:
-                width = im_width
-            else:
-                width = 100
+        return self._add_image(filename, data, digest, link_to_file, save_with_document, left, top, width, height,
+                               name)
 
-        if height is None:
-            if im_height is not None:
-                height = im_height
-            else:
-                height = 100
+    def add_many(self, images, left=0, top=0, processes=None):
+        """
+        Renders several Matplotlib figures in parallel and adds them as named pictures to the specified sheet with
+        screen updating turned off. Existing pictures with the same name are updated like with
+        ``pictures.add(..., update=True)``.
 
-        picture = Picture(impl=self.impl.add(
-            filename, link_to_file, save_with_document, left, top, width, height
-        ))
+        Arguments
+        ---------
+
+        images : dict or list of (name, image) tuples
+            Maps the picture names to Matplotlib figures or to functions that return one. The images are rendered
+            in a pool of processes with the Agg backend, so figures and functions should be picklable, i.e. functions
+            have to be defined at the top level of a module (or wrapped with ``functools.partial``).
+
+        left : float, default 0
+            Left position in points of the pictures that don't exist yet.
+
+        top : float, default 0
+            Top position in points of the pictures that don't exist yet.
+
+        processes : int, default None
+            Number of processes. Defaults to the number of CPUs. With 1, the images are rendered in this process.
+            The pool is started on the first call and reused afterwards.
+
+        Returns
+        -------
+        list of Picture
+
+        .. note:: On Windows, the worker processes import the main module of your script again. A script that calls
+            ``add_many`` at the top level must therefore protect its code with ``if __name__ == '__main__':``,
+            otherwise every worker runs it once more. Images that can't be pickled are rendered in this process.
+
+        Examples
+        --------
+
+        >>> import xlwings as xw
+        >>> sht = xw.Book().sheets[0]
+        >>> sht.pictures.add_many({'Sales': sales_figure, 'Costs': costs_figure})
+        [<Picture 'Sales' in <Sheet [Book1]Sheet1>>, <Picture 'Costs' in <Sheet [Book1]Sheet1>>]
+
+        .. versionadded:: 0.10.1
+        """
+        items = list(images.items() if hasattr(images, 'items') else images)
+        rendered = utils.render_figures([image for name, image in items], processes)
+
+        app = self.parent.book.app
+        screen_updating = app.screen_updating
+        app.screen_updating = False
+        try:
+            pictures = []
+            for (name, image), (data, width, height) in zip(items, rendered):
+                digest = utils.get_image_digest(None, data)
+                try:
+                    picture = self[name]
+                except KeyError:
+                    picture = self._add_image(None, data, digest, False, True, left, top, width, height, name)
+                else:
+                    picture = picture._update_image(None, data, digest)
+                pictures.append(picture)
+        finally:
+            app.screen_updating = screen_updating
+        return pictures
+
+    def _add_image(self, filename, data, digest, link_to_file, save_with_document, left, top, width, height, name):
+        # A linked picture needs its file to stay around
+        with utils.image_file(filename, data, remove=not link_to_file) as filename:
+            # Image dimensions
+            im_width, im_height = None, None
+            if width is None or height is None:
+                if Image:
+                    with Image.open(filename) as im:
+                        im_width, im_height = im.size
+
+            if width is None:
+                if im_width is not None:
+                    width = im_width
+                else:
+                    width = 100
+
+            if height is None:
+                if im_height is not None:
+                    height = im_height
+                else:
+                    height = 100
+
+            picture = Picture(impl=self.impl.add(
+                filename, link_to_file, save_with_document, left, top, width, height
+            ))
+            collections_changed()
 
         if name is not None:
             picture.name = name
+        if digest is not None:
+            picture._digest = digest
         return picture
 
 
+# Prefix of the alternative text that holds the sha1 of the image a picture shows, so that updates with the same
+# image can be skipped
+IMAGE_DIGEST_PREFIX = 'xlwings-sha1:'
+
+
 class Names(object):
     """
     A collection of all :meth:`name <Name>` objects in the workbook:
@@ -2486,6 +2735,8 @@ class Names(object):
     .. versionadded:: 0.9.0
     """
 
+    _name_index = None
+
     def __init__(self, impl):
         self.impl = impl
 
@@ -2498,10 +2749,27 @@ class Names(object):
         """
         return self.impl.api
 
+    def cache_names(self):
+        """
+        Looks up names in a cached map instead of asking Excel for every lookup, see
+        :meth:`Collection.cache_names() <xlwings.main.Sheets.cache_names>`. Returns the collection.
+
+        .. versionadded:: 0.10.1
+        """
+        self._name_index = NameIndex(self)
+        return self
+
     def __call__(self, name_or_index):
+        if self._name_index is not None and isinstance(name_or_index, string_types):
+            index = self._name_index.get(name_or_index)
+            if index is None:
+                raise KeyError(name_or_index)
+            name_or_index = index
         return Name(impl=self.impl(name_or_index))
 
     def contains(self, name_or_index):
+        if self._name_index is not None and isinstance(name_or_index, string_types):
+            return self._name_index.get(name_or_index) is not None
         return self.impl.contains(name_or_index)
 
     def __len__(self):
@@ -2533,8 +2801,32 @@ class Names(object):
 
         .. versionadded:: 0.9.0
         """
+        collections_changed()
         return Name(impl=self.impl.add(name, refers_to))
 
+    def to_dict(self):
+        """
+        Returns a dictionary that maps all names to what they refer to (``refers_to``), e.g.
+        ``{'MyName': '=Sheet1!$A$3'}``. This reads the names in far fewer calls than iterating over the Name objects.
+
+        .. versionadded:: 0.10.1
+        """
+        return self.impl.to_dict()
+
+    def update(self, mapping):
+        """
+        Defines all names of a dictionary like the one returned by :meth:`to_dict`. Existing names are redefined.
+
+        Parameters
+        ----------
+        mapping : dict
+            Maps the names to what they refer to, in English, using A1-style notation, e.g. ``'=Sheet1!$A$3'``.
+
+        .. versionadded:: 0.10.1
+        """
+        collections_changed()
+        self.impl.update(mapping)
+
     def __getitem__(self, item):
         if isinstance(item, numbers.Number):
             return self(item + 1)
@@ -2607,6 +2899,7 @@ class Name(object):
          .. versionadded:: 0.9.0
          """
         self.impl.delete()
+        collections_changed()
 
     @property
     def name(self):
@@ -2620,6 +2913,7 @@ class Name(object):
     @name.setter
     def name(self, value):
         self.impl.name = value
+        collections_changed()
 
     @property
     def refers_to(self):
@@ -2648,7 +2942,7 @@ class Name(object):
         return "<Name '%s': %s>" % (self.name, self.refers_to)
     
 
-def view(obj, sheet=None):
+def view(obj, sheet=None, max_rows=None, sample=100, chunksize=10000):
     """
     Opens a new workbook and displays an object on its first sheet by default. If you provide a
     sheet object, it will clear the sheet before displaying the object on the existing sheet.
@@ -2661,6 +2955,16 @@ def view(obj, sheet=None):
     sheet : Sheet, default None
         Sheet object. If none provided, the first sheet of a new workbook is used.
 
+    max_rows : int, default None
+        Only displays the first ``max_rows`` rows of pandas DataFrames and Series, 2d NumPy arrays and nested lists.
+        Use it to have a quick look at huge objects.
+
+    sample : int, default 100
+        Number of rows below the header that are used to autofit the columns.
+
+    chunksize : int, default 10000
+        pandas DataFrames, 2d NumPy arrays and nested lists are written in chunks of this many rows.
+
     Examples
     --------
 
@@ -2669,16 +2973,107 @@ def view(obj, sheet=None):
     >>> import numpy as np
     >>> df = pd.DataFrame(np.random.rand(10, 4), columns=['a', 'b', 'c', 'd'])
     >>> xw.view(df)
+    >>> xw.view(big_df, max_rows=1000)
 
     .. versionadded:: 0.7.1
+
+    .. versionchanged:: 0.10.1
+        Added ``max_rows``, ``sample`` and ``chunksize``.
     """
     if sheet is None:
         sheet = Book().sheets.active
     else:
         sheet.clear()
 
-    sheet.range('A1').value = obj
-    sheet.autofit()
+    layout = get_table_layout(obj)
+    if max_rows is not None and (layout is not None or hasattr(obj, 'iloc')):
+        obj = get_rows(obj, 0, max_rows)
+        layout = get_table_layout(obj)
+
+    app = sheet.book.app
+    screen_updating, calculation = app.screen_updating, app.calculation
+    app.screen_updating = False
+    app.calculation = 'manual'
+    try:
+        if layout is None:
+            sheet.range('A1').value = obj
+            sheet.autofit()
+        else:
+            header_rows, n_rows, n_cols = layout
+            sheet.range('A1').value = get_rows(obj, 0, chunksize)
+            for start in range(chunksize, n_rows, chunksize):
+                rng = sheet.range((header_rows + start + 1, 1))
+                if header_rows:
+                    rng = rng.options(header=False)
+                rng.value = get_rows(obj, start, start + chunksize)
+            if n_cols:
+                sheet.range((1, 1), (header_rows + max(min(n_rows, sample), 1), n_cols)).autofit()
+    finally:
+        app.calculation = calculation
+        app.screen_updating = screen_updating
+
+
+def get_table_layout(obj):
+    """
+    Returns ``(header_rows, n_rows, n_cols)`` of the objects that ``view`` writes in chunks, i.e. DataFrames,
+    2d arrays and nested lists, or None for anything else.
+    """
+    if hasattr(obj, 'iloc') and hasattr(obj, 'columns'):
+        return obj.columns.nlevels, len(obj), len(obj.columns) + obj.index.nlevels
+    elif getattr(obj, 'ndim', None) == 2:
+        return 0, obj.shape[0], obj.shape[1]
+    elif isinstance(obj, (list, tuple)) and obj and all(isinstance(row, (list, tuple)) for row in obj):
+        return 0, len(obj), max(len(row) for row in obj)
+    return None
+
+
+def get_rows(obj, start, stop):
+    if hasattr(obj, 'iloc'):
+        return obj.iloc[start:stop]
+    return obj[start:stop]
+
+
+_pinned = threading.local()
+
+
+def _get_pinned():
+    # (sheet, book) of the innermost use() block of the current thread or None
+    stack = getattr(_pinned, 'stack', None)
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def use(sheet):
+    """
+    Binds ``xw.Range``, ``xw.Shape``, ``xw.Chart``, ``xw.Sheet``, ``xw.books`` and ``xw.sheets`` to the given sheet
+    and its book within a ``with`` block instead of the active ones. This saves looking up the active objects
+    whenever one of them is used and the code keeps working with the same sheet even if the user activates another
+    one in the meantime. The binding only applies to the current thread and blocks can be nested.
+
+    Parameters
+    ----------
+    sheet : Sheet
+        Sheet object that replaces the active sheet.
+
+    Examples
+    --------
+
+    >>> import xlwings as xw
+    >>> wb = xw.Book('Book1.xlsx')
+    >>> with xw.use(wb.sheets['Sheet2']):
+    ...     xw.Range('A1').value = 1
+    ...     xw.Range((2, 1)).value = 2
+
+    .. versionadded:: 0.10.1
+    """
+    stack = getattr(_pinned, 'stack', None)
+    if stack is None:
+        stack = _pinned.stack = []
+    stack.append((sheet, sheet.book))
+    try:
+        yield sheet
+    finally:
+        stack.pop()
 
 
 class Macro(object):
@@ -2717,6 +3112,7 @@ class Books(Collection):
         """
         Creates a new Book. The new Book becomes the active Book. Returns a Book object.
         """
+        collections_changed()
         return Book(impl=self.impl.add())
 
     def open(self, fullname):
@@ -2755,6 +3151,7 @@ class Books(Collection):
                 )
         except KeyError:
             impl = self.impl.open(fullname)
+            collections_changed()
         return Book(impl=impl)
 
 
@@ -2783,7 +3180,7 @@ class Sheets(Collection):
         if isinstance(name_or_index, Sheet):
             return name_or_index
         else:
-            return Sheet(impl=self.impl(name_or_index))
+            return super(Sheets, self).__call__(name_or_index)
 
     def __delitem__(self, name_or_index):
         self[name_or_index].delete()
@@ -2813,6 +3210,7 @@ class Sheets(Collection):
         if after is not None and not isinstance(after, Sheet):
             after = self(after)
         impl = self.impl.add(before and before.impl, after and after.impl)
+        collections_changed()
         if name is not None:
             impl.name = name
         return Sheet(impl=impl)
@@ -2828,8 +3226,22 @@ class ActiveAppBooks(Books):
 
     @property
     def impl(self):
+        pinned = _get_pinned()
+        if pinned is not None:
+            return pinned[1].app.books.impl
         return apps.active.books.impl
 
+    @property
+    def active(self):
+        pinned = _get_pinned()
+        if pinned is not None:
+            return pinned[1]
+        return Book(impl=self.impl.active)
+
+    def cache_names(self):
+        # The active app can change, so the names are cached on the books of the app that is active right now
+        return Books(impl=self.impl).cache_names()
+
 
 class ActiveBookSheets(Sheets):
 
@@ -2841,8 +3253,22 @@ class ActiveBookSheets(Sheets):
 
     @property
     def impl(self):
+        pinned = _get_pinned()
+        if pinned is not None:
+            return pinned[1].sheets.impl
         return books.active.sheets.impl
 
+    @property
+    def active(self):
+        pinned = _get_pinned()
+        if pinned is not None:
+            return pinned[0]
+        return Sheet(impl=self.impl.active)
+
+    def cache_names(self):
+        # The active book can change, so the names are cached on the sheets of the book that is active right now
+        return Sheets(impl=self.impl).cache_names()
+
 
 books = ActiveAppBooks()
 
@@ -0,0 +1,176 @@
+"""
+Call statistics of UDFs: call counts, result sizes and latency histograms of the three phases of a call (argument
+conversion, function body and return value conversion).
+"""
+import io
+import csv
+import json
+import threading
+
+from . import PY3
+
+
+class Histogram(object):
+    """
+    HDR-style latency histogram: values are recorded in microseconds and every power of two is split into
+    ``sub_buckets`` linear buckets, so the relative error of the reported percentiles stays below
+    ``1 / sub_buckets`` while the memory footprint only grows with the logarithm of the value range.
+    """
+
+    def __init__(self, sub_buckets=32):
+        self.sub_buckets = sub_buckets
+        self.shift = sub_buckets.bit_length() - 1
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        us = max(int(seconds * 1e6), 0)
+        exponent = max(us.bit_length() - 1 - self.shift, 0)
+        bucket = (exponent, us >> exponent)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.
+
+    def percentile(self, p):
+        """Returns the upper bound (in seconds) of the bucket containing the ``p``-th percentile."""
+        if not self.count:
+            return 0.
+        threshold = self.count * p / 100.
+        seen = 0
+        for exponent, sub in sorted(self.buckets):
+            seen += self.buckets[(exponent, sub)]
+            if seen >= threshold:
+                return min(((sub + 1) << exponent) / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'min': self.min or 0.,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': self.max or 0.,
+        }
+
+
+class FunctionStats(object):
+
+    phases = ('args', 'call', 'ret', 'total')
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.cells = 0
+        self.histograms = dict((phase, Histogram()) for phase in self.phases)
+
+    def record(self, args_time, call_time, ret_time, cells):
+        self.calls += 1
+        self.cells += cells
+        self.histograms['args'].record(args_time)
+        self.histograms['call'].record(call_time)
+        self.histograms['ret'].record(ret_time)
+        self.histograms['total'].record(args_time + call_time + ret_time)
+
+    def summary(self):
+        return {
+            'function': self.name,
+            'calls': self.calls,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'cells': self.cells,
+            'latency': dict((phase, self.histograms[phase].summary()) for phase in self.phases)
+        }
+
+
+class UDFProfiler(object):
+    """
+    Collects the statistics of all UDF calls that go through the UDF server, see ``xlwings.udfs.profiler``. Calls
+    are recorded from the server's thread as well as from the worker threads of the executors.
+    """
+
+    columns = ['function', 'calls', 'errors', 'timeouts', 'cells/call', 'mean [ms]', 'p50 [ms]', 'p90 [ms]',
+               'p99 [ms]', 'max [ms]', 'args [ms]', 'call [ms]', 'ret [ms]']
+
+    def __init__(self):
+        self.enabled = True
+        self.functions = {}
+        self.lock = threading.Lock()
+
+    def get(self, name):
+        try:
+            return self.functions[name]
+        except KeyError:
+            stats = self.functions[name] = FunctionStats(name)
+            return stats
+
+    def record(self, name, args_time, call_time, ret_time, cells):
+        if self.enabled:
+            with self.lock:
+                self.get(name).record(args_time, call_time, ret_time, cells)
+
+    def record_error(self, name):
+        if self.enabled:
+            with self.lock:
+                self.get(name).errors += 1
+
+    def record_timeout(self, name):
+        if self.enabled:
+            with self.lock:
+                self.get(name).timeouts += 1
+
+    def reset(self):
+        with self.lock:
+            self.functions = {}
+
+    def report(self):
+        """Returns the statistics as a list of dicts, sorted by the total time spent in each function."""
+        with self.lock:
+            stats = sorted(self.functions.values(), key=lambda s: s.histograms['total'].total, reverse=True)
+            return [s.summary() for s in stats]
+
+    def table(self):
+        """Returns the statistics as a 2d list with a header row, latencies in milliseconds."""
+        rows = [list(self.columns)]
+        for s in self.report():
+            total = s['latency']['total']
+            rows.append([
+                s['function'],
+                s['calls'],
+                s['errors'],
+                s['timeouts'],
+                float(s['cells']) / s['calls'] if s['calls'] else 0.,
+                total['mean'] * 1e3,
+                total['p50'] * 1e3,
+                total['p90'] * 1e3,
+                total['p99'] * 1e3,
+                total['max'] * 1e3,
+                s['latency']['args']['mean'] * 1e3,
+                s['latency']['call']['mean'] * 1e3,
+                s['latency']['ret']['mean'] * 1e3,
+            ])
+        return rows
+
+    def to_csv(self, path):
+        if PY3:
+            f = io.open(path, 'w', newline='')
+        else:
+            f = open(path, 'wb')
+        with f:
+            csv.writer(f).writerows(self.table())
+
+    def to_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
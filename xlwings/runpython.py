@@ -0,0 +1,169 @@
+"""
+A long-lived process that runs the commands of ``RunPython``, started with ``xlwings runpython serve``.
+
+With ``RUNPYTHON_DAEMON = True`` in the VBA settings, ``RunPython`` only starts a thin client (``main`` below) that
+sends the command, the command line arguments that identify the calling workbook and its ``sys.path`` to the daemon
+via ``xlwings.transport``. The daemon runs the command with these arguments, so ``xw.Book.caller()`` works as usual,
+while modules like NumPy, pandas and xlwings itself stay imported. Modules from the directories of the workbook are
+imported again once their source file changes, and modules from the directories of other workbooks are unloaded, so
+modules with the same name in different workbook directories don't collide. If no daemon is running, the client runs
+the command itself.
+
+Like ``transport``, this module can be imported as a top-level module from the xlwings directory without importing
+the xlwings package, which is what the client does.
+"""
+import os
+import sys
+import json
+import socket
+import traceback
+
+try:
+    from . import transport
+except (ImportError, ValueError):
+    import transport
+
+if sys.version_info[0] == 3:
+    from io import StringIO
+else:
+    from StringIO import StringIO
+
+
+def get_connection_file():
+    return os.path.join(os.path.expanduser('~'), '.xlwings', 'runpython.json')
+
+
+class RunPythonDispatcher(transport.Dispatcher):
+
+    public_methods = set(['Run'])
+
+    def Run(self, command, argv, path):
+        client_path = [p for p in path if p and p not in server_path]
+        user_dirs = [os.path.normcase(os.path.abspath(p)) for p in client_path]
+        unload_foreign_modules(user_dirs)
+        unload_changed_modules(user_dirs)
+
+        stdout, stderr = StringIO(), StringIO()
+        saved = sys.argv, sys.stdout, sys.stderr, list(sys.path)
+        sys.argv = ['-c'] + list(argv)
+        sys.stdout, sys.stderr = stdout, stderr
+        # the client's directories take precedence over the daemon's, but only for this call
+        sys.path[:0] = client_path
+        try:
+            exec(command, {'__name__': '__main__'})
+            ok = True
+        except SystemExit as e:
+            ok = e.code in (None, 0)
+        except BaseException:
+            traceback.print_exc()
+            ok = False
+        finally:
+            sys.argv, sys.stdout, sys.stderr, sys.path[:] = saved
+        record_module_mtimes(user_dirs)
+        return ok, stdout.getvalue(), stderr.getvalue()
+
+
+# sys.path of the daemon when it was started, directories that only the clients add are the workbooks' directories
+server_path = list(sys.path)
+
+# module name -> modification time of its source file when it was imported
+module_mtimes = {}
+
+# module name -> the workbook directory it has been imported from
+module_dirs = {}
+
+
+def get_user_modules(user_dirs):
+    for name, module in list(sys.modules.items()):
+        filename = getattr(module, '__file__', None)
+        if not filename:
+            continue
+        if filename.endswith(('.pyc', '.pyo')):
+            filename = filename[:-1]
+        dirname = os.path.normcase(os.path.dirname(os.path.abspath(filename)))
+        if dirname in user_dirs and os.path.exists(filename):
+            yield name, filename, dirname
+
+
+def record_module_mtimes(user_dirs):
+    for name, filename, dirname in get_user_modules(user_dirs):
+        if name not in module_mtimes:
+            module_mtimes[name] = os.path.getmtime(filename)
+            module_dirs[name] = dirname
+
+
+def unload_module(name):
+    sys.modules.pop(name, None)
+    module_mtimes.pop(name, None)
+    module_dirs.pop(name, None)
+
+
+def unload_changed_modules(user_dirs):
+    # The next import of a module that has been changed since it was imported loads it again
+    for name, filename, dirname in get_user_modules(user_dirs):
+        if name in module_mtimes and module_mtimes[name] != os.path.getmtime(filename):
+            unload_module(name)
+
+
+def unload_foreign_modules(user_dirs):
+    # Modules of other workbooks' directories would shadow the modules of the same name of the calling workbook
+    for name, dirname in list(module_dirs.items()):
+        if dirname not in user_dirs:
+            unload_module(name)
+
+
+class DaemonServer(transport.Server):
+
+    def process_request(self, request, client_address):
+        # Commands use COM/AppleScript objects and global state like sys.argv, so they run one at a time on the main
+        # thread instead of a thread per connection
+        self.finish_request(request, client_address)
+        self.shutdown_request(request)
+
+
+def serve(port=0):
+    # Import what the commands need upfront, so the first click is fast, too
+    __import__('xlwings')
+    from xlwings.executors import PRELOAD_MODULES
+    for module_name in PRELOAD_MODULES:
+        try:
+            __import__(module_name)
+        except ImportError:
+            pass
+
+    server_path[:] = sys.path
+    server = DaemonServer(('127.0.0.1', port), dispatcher_class=RunPythonDispatcher)
+    connection_file = get_connection_file()
+    if not os.path.isdir(os.path.dirname(connection_file)):
+        os.makedirs(os.path.dirname(connection_file))
+    with open(connection_file, 'w') as f:
+        json.dump({'port': server.server_address[1], 'token': server.token, 'pid': os.getpid()}, f)
+    print('xlwings RunPython daemon running on port %s' % server.server_address[1])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.remove(connection_file)
+        except OSError:
+            pass
+
+
+def main(command):
+    """Entry point of the thin client that ``RunPython`` starts with ``RUNPYTHON_DAEMON = True``."""
+    try:
+        with open(get_connection_file()) as f:
+            info = json.load(f)
+        client = transport.Client(('127.0.0.1', info['port']), info['token'])
+    except (IOError, OSError, ValueError, KeyError, socket.error, transport.RemoteError):
+        # No daemon running: run the command in this process, like RunPython does without the daemon
+        exec(command, {'__name__': '__main__'})
+        return
+    with client:
+        ok, out, err = client.Run(command, sys.argv[1:], sys.path)
+    sys.stdout.write(out)
+    sys.stderr.write(err)
+    if not ok:
+        sys.exit(1)
@@ -18,7 +18,10 @@ import win32api
 import win32event
 os.chdir(cwd)
 
+import time
 import types
+import itertools
+import threading
 import pythoncom
 import pywintypes
 import win32com.client
@@ -26,7 +29,8 @@ import win32com.server.util as serverutil
 import win32com.server.dispatcher
 import win32com.server.policy
 
-from .udfs import call_udf
+from . import xlplatform
+from .udfs import call_udf, is_busy_error
 
 class XLPythonOption(object):
     """ The XLPython class itself """
@@ -52,32 +56,58 @@ class XLPythonObject(object):
         return len(self.obj)
 
 
+def is_sequence(obj):
+    t = type(obj)
+    return t in (list, tuple) or (t.__name__ == 'ndarray' and t.__module__ == 'numpy')
+
+
 class XLPythonEnumerator:
+    """
+    Returns up to ``count`` items per call of ``Next``. Lists, tuples and NumPy arrays are enumerated by index, so they
+    also support ``Skip``, ``Reset`` and ``Clone``; other iterables can only be skipped.
+    """
     _public_methods_ = ["Next", "Skip", "Reset", "Clone"]
 
-    def __init__(self, gen):
-        self.iter = gen.__iter__()
+    def __init__(self, gen, index=0):
+        self.gen = gen
+        if is_sequence(gen):
+            self.seq = gen
+            self.index = index
+            self.iter = None
+        else:
+            self.seq = None
+            self.iter = gen.__iter__()
 
     def _query_interface_(self, iid):
         if iid == pythoncom.IID_IEnumVARIANT:
             return 1
 
     def Next(self, count):
-        r = []
-        try:
-            r.append(ToVariant(next(self.iter)))
-        except StopIteration:
-            pass
-        return r
+        if self.seq is not None:
+            items = self.seq[self.index:self.index + count]
+            self.index += len(items)
+        else:
+            items = itertools.islice(self.iter, count)
+        return [ToVariant(item) for item in items]
 
     def Skip(self, count):
-        raise win32com.server.exception.COMException(scode=0x80004001)  # E_NOTIMPL
+        if self.seq is not None:
+            self.index = min(self.index + count, len(self.seq))
+        else:
+            for _ in itertools.islice(self.iter, count):
+                pass
 
     def Reset(self):
-        raise win32com.server.exception.COMException(scode=0x80004001)  # E_NOTIMPL
+        if self.seq is not None:
+            self.index = 0
+        else:
+            raise win32com.server.exception.COMException(scode=0x80004001)  # E_NOTIMPL
 
     def Clone(self):
-        raise win32com.server.exception.COMException(scode=0x80004001)  # E_NOTIMPL
+        if self.seq is not None:
+            return win32com.server.util.wrap(XLPythonEnumerator(self.seq, self.index), iid=pythoncom.IID_IEnumVARIANT)
+        else:
+            raise win32com.server.exception.COMException(scode=0x80004001)  # E_NOTIMPL
 
 
 PyIDispatch = pythoncom.TypeIIDs[pythoncom.IID_IDispatch]
@@ -101,7 +131,7 @@ class XLPython(object):
     _public_methods_ = ['Module', 'Tuple', 'TupleFromArray', 'Dict', 'DictFromArray', 'List', 'ListFromArray', 'Obj',
                         'Str', 'Var', 'Call', 'GetItem', 'SetItem', 'DelItem', 'Contains', 'GetAttr', 'SetAttr',
                         'DelAttr', 'HasAttr', 'Eval', 'Exec', 'ShowConsole', 'Builtin', 'Len', 'Bool',
-                        'CallUDF']
+                        'CallUDF', 'ToArray']
 
     def ShowConsole(self):
         import ctypes
@@ -166,6 +196,15 @@ class XLPython(object):
         else:
             return value
 
+    def ToArray(self, obj):
+        # Returns a list, tuple or NumPy array as a single array in one call instead of enumerating it
+        value = FromVariant(obj)
+        if not is_sequence(value):
+            raise Exception("ToArray expects a list, tuple or NumPy array, got %s" % type(value).__name__)
+        if type(value).__name__ == 'ndarray':
+            value = value.tolist()
+        return (list(value),)
+
     def Call(self, obj, *args):
         obj = FromVariant(obj)
         method = None
@@ -277,15 +316,172 @@ class XLPython(object):
         exec (stmt, globals, locals)
 
 
-idle_queue = []
+class IdleQueue(object):
+    """
+    Tasks that are run once Excel is idle. A task with a ``key`` attribute supersedes a pending task with the same key
+    (e.g. the pending write of a dynamic array formula that has since been recalculated), so only the most recent
+    one is run. Tasks with the same ``batch`` attribute are run together and if they provide an ``xl_app``, screen
+    updating is turned off while the batch runs. Tasks may be added from any thread, they are always run on the
+    server's thread. A task can be delayed, and a task that fails because Excel rejects a call while it's busy is
+    run again after ``BUSY_RETRY_DELAY`` seconds.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tasks = {}
+        self.seq = 0
+        self.n_added = 0
+        self.n_superseded = 0
+        self.n_run = 0
+        self.total_latency = 0.
+        self.max_latency = 0.
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def add(self, task, delay=0.):
+        with self.lock:
+            self.seq += 1
+            self.n_added += 1
+            key = getattr(task, 'key', None)
+            if key is None:
+                key = ('task', self.seq)
+            elif key in self.tasks:
+                self.n_superseded += 1
+            now = time.time()
+            self.tasks[key] = (self.seq, now, task, now + delay)
+
+    def wait_time(self):
+        """Returns the seconds until the next task is due (0 if one is due now) or None if there are no tasks."""
+        with self.lock:
+            if not self.tasks:
+                return None
+            return max(min(entry[3] for entry in self.tasks.values()) - time.time(), 0.)
+
+    def due(self):
+        return self.wait_time() == 0.
+
+    def pop_all(self):
+        # Pops the tasks that are due
+        now = time.time()
+        with self.lock:
+            tasks = [(key, entry) for key, entry in self.tasks.items() if entry[3] <= now]
+            for key, entry in tasks:
+                del self.tasks[key]
+        tasks.sort(key=lambda x: x[1][0])
+        batches = []
+        batch_index = {}
+        for key, (seq, queued, task, due) in tasks:
+            batch = getattr(task, 'batch', None)
+            if batch is None or batch not in batch_index:
+                batch_index[batch] = len(batches)
+                batches.append([])
+            batches[batch_index[batch]].append((key, seq, queued, task, due))
+        return batches
+
+    def requeue(self, entries, delay=None):
+        # Puts back tasks that didn't fit into the time budget or that are to be retried (after ``delay`` seconds),
+        # unless they have been superseded in the meantime
+        with self.lock:
+            for key, seq, queued, task, due in entries:
+                if key in self.tasks:
+                    self.n_superseded += 1
+                else:
+                    self.tasks[key] = (seq, queued, task, due if delay is None else time.time() + delay)
+
+    def run(self, budget=None):
+        """
+        Runs the pending tasks. With a ``budget`` in seconds, the tasks that are left once it is used up are put back
+        into the queue, so the caller can pump messages in between.
+        """
+        deadline = None if budget is None else time.time() + budget
+        batches = self.pop_all()
+        for i, batch in enumerate(batches):
+            xl_app = getattr(batch[0][3], 'xl_app', None)
+            screen_updating = None
+            try:
+                if xl_app is not None:
+                    try:
+                        screen_updating = xl_app.ScreenUpdating
+                        xl_app.ScreenUpdating = False
+                    except Exception as e:
+                        if is_busy_error(e):
+                            self.requeue(batch, BUSY_RETRY_DELAY)
+                            continue
+                        screen_updating = None
+                for j, entry in enumerate(batch):
+                    if deadline is not None and time.time() > deadline:
+                        self.requeue(batch[j:] + [entry for rest in batches[i + 1:] for entry in rest])
+                        return
+                    key, seq, queued, task, due = entry
+                    latency = time.time() - queued
+                    self.total_latency += latency
+                    self.max_latency = max(self.max_latency, latency)
+                    self.n_run += 1
+                    try:
+                        task()
+                    except Exception as e:
+                        if is_busy_error(e):
+                            self.requeue([entry], BUSY_RETRY_DELAY)
+                        else:
+                            import traceback
+                            print("TaskQueue '%s' threw an exeception: %s" % (task, traceback.format_exc()))
+            finally:
+                if screen_updating is not None:
+                    xl_app.ScreenUpdating = screen_updating
+
+    def stats(self):
+        return {
+            'depth': len(self),
+            'added': self.n_added,
+            'superseded': self.n_superseded,
+            'run': self.n_run,
+            'mean_latency': self.total_latency / self.n_run if self.n_run else 0.,
+            'max_latency': self.max_latency,
+        }
+
+
+idle_queue = IdleQueue()
 idle_queue_event = win32event.CreateEvent(None, 0, 0, None)
 
+# Seconds the serve loop spends on idle tasks before it pumps messages again
+IDLE_TASK_BUDGET = 0.05
+
+# Seconds after which a task that failed because Excel was busy is run again
+BUSY_RETRY_DELAY = 0.1
 
-def add_idle_task(task):
-    idle_queue.append(task)
+
+def add_idle_task(task, delay=0.):
+    idle_queue.add(task, delay)
     win32event.SetEvent(idle_queue_event)
 
 
+def wait_pumping(task, timeout=None):
+    """
+    Waits for ``task`` (see ``executors.ThreadTask``) while pumping the messages of the server's thread, so that it
+    keeps serving incoming COM calls. Returns False if the timeout (in seconds) expired before the task finished.
+    """
+    done_event = win32event.CreateEvent(None, 0, 0, None)
+    task.add_done_callback(lambda: win32event.SetEvent(done_event))
+    deadline = None if timeout is None else time.time() + timeout
+    # the calls that are served while pumping set the calling book of their own
+    book_caller = xlplatform.BOOK_CALLER
+    try:
+        while not task.done():
+            if deadline is None:
+                wait = win32event.INFINITE
+            else:
+                wait = int(max(deadline - time.time(), 0) * 1000)
+            rc = win32event.MsgWaitForMultipleObjects([done_event], 0, wait, win32event.QS_ALLINPUT)
+            if rc == win32event.WAIT_OBJECT_0 + 1:
+                pythoncom.PumpWaitingMessages()
+            elif rc == win32event.WAIT_TIMEOUT:
+                return task.done()
+        return True
+    finally:
+        xlplatform.BOOK_CALLER = book_caller
+
+
 def serve(clsid="{506e67c3-55b5-48c3-a035-eed5deea7d6d}"):
     """Launch the COM server, clsid is the XLPython object class id """
     clsid = pywintypes.IID(clsid)
@@ -315,25 +511,21 @@ def serve(clsid="{506e67c3-55b5-48c3-a035-eed5deea7d6d}"):
     print('xlwings server running, clsid=%s' % clsid)
 
     while True:
+        wait = idle_queue.wait_time()
         rc = win32event.MsgWaitForMultipleObjects(
             [idle_queue_event],
             0,
-            win32event.INFINITE,
+            win32event.INFINITE if wait is None else int(wait * 1000),
             win32event.QS_ALLEVENTS
         )
 
         while True:
             pythoncom.PumpWaitingMessages()
 
-            if not idle_queue:
+            if not idle_queue.due():
                 break
 
-            task = idle_queue.pop(0)
-            try:
-                task()
-            except:
-                import traceback
-                print("TaskQueue '%s' threw an exeception: %s", task, traceback.format_exc())
+            idle_queue.run(IDLE_TASK_BUDGET)
 
     pythoncom.CoRevokeClassObject(revokeId)
     pythoncom.CoUninitialize()
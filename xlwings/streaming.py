@@ -0,0 +1,252 @@
+"""
+Streaming UDFs: a UDF that is a generator (or an async generator) keeps feeding its calling cell with every value
+it yields.
+
+The first call starts a subscription that is keyed by the function and the address of the calling cell. The generator is consumed in
+a background thread (async generators run on a shared event loop thread), which only stores the latest value. A
+dispatcher thread decides when the cells are due for an update - at most ``max_rate`` times per second per cell and
+``streams.max_rate`` times per second overall - and posts an idle task to the UDF server that recalculates them. The
+recalculation calls the UDF again, which returns the latest value instead of restarting the generator, unless the
+arguments changed. Subscriptions whose cell doesn't contain the formula anymore are closed.
+"""
+import inspect
+import threading
+import time
+
+# Seconds between the checks of subscriptions that stopped ticking for whether their formulas still exist
+SWEEP_INTERVAL = 30.
+
+
+def is_stream_function(func):
+    if inspect.isgeneratorfunction(func):
+        return True
+    isasyncgenfunction = getattr(inspect, 'isasyncgenfunction', None)
+    return isasyncgenfunction is not None and isasyncgenfunction(func)
+
+
+class Subscription(object):
+
+    def __init__(self, manager, key, signature, caller, func_name, max_rate=None):
+        self.manager = manager
+        self.key = key
+        self.signature = signature
+        self.caller = caller
+        self.func_name = func_name
+        self.interval = 1. / max_rate if max_rate else 0.
+        self.value = None
+        self.error = None
+        self.has_value = False
+        self.dirty = False
+        self.queued = False
+        self.last_update = 0.
+        self.active = True
+        self.loop = None
+        self.future = None
+
+    def start(self, gen):
+        if inspect.isgenerator(gen):
+            thread = threading.Thread(target=self._run, args=(gen,))
+            thread.daemon = True
+            thread.start()
+        else:
+            self.loop = self.manager.get_event_loop()
+            self.loop.call_soon_threadsafe(self._next_async, gen)
+
+    def _run(self, gen):
+        try:
+            for value in gen:
+                if not self.active:
+                    break
+                self.manager.push(self, value)
+                if not self.active:
+                    break
+        except Exception as e:
+            self.manager.push(self, error=e)
+        finally:
+            gen.close()
+
+    def _next_async(self, gen):
+        # Runs on the event loop thread, async generators are driven without async syntax to stay Python 2 compatible
+        import asyncio
+        if not self.active:
+            asyncio.ensure_future(gen.aclose(), loop=self.loop)
+            return
+        self.future = asyncio.ensure_future(gen.__anext__(), loop=self.loop)
+        self.future.add_done_callback(lambda future: self._on_async_value(gen, future))
+
+    def _on_async_value(self, gen, future):
+        import asyncio
+        if future.cancelled():
+            asyncio.ensure_future(gen.aclose(), loop=self.loop)
+            return
+        error = future.exception()
+        if error is None:
+            self.manager.push(self, future.result())
+            self._next_async(gen)
+        elif not isinstance(error, StopAsyncIteration):
+            self.manager.push(self, error=error)
+
+    def close(self):
+        """Stops consuming the generator. A synchronous generator stops once it yields its next value."""
+        self.active = False
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._cancel_async)
+
+    def _cancel_async(self):
+        if self.future is not None:
+            self.future.cancel()
+
+    def has_formula(self):
+        from .udfs import caller_has_formula
+        return caller_has_formula(self.caller, self.func_name)
+
+
+class StreamUpdate(object):
+    """Idle task that recalculates the cells of all subscriptions that are due for an update."""
+
+    # pending updates are coalesced into a single task
+    key = 'xlwings.streaming'
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def __call__(self, *args, **kwargs):
+        self.manager.update()
+
+
+class StreamManager(object):
+
+    def __init__(self, max_rate=10.):
+        # maximum number of update batches per second, across all subscriptions
+        self.max_rate = max_rate
+        self.subscriptions = {}
+        self.condition = threading.Condition()
+        self.last_dispatch = 0.
+        self.last_sweep = time.time()
+        self.sweep = False
+        self.dispatcher = None
+        self.loop = None
+
+    def get_event_loop(self):
+        with self.condition:
+            if self.loop is None:
+                import asyncio
+                self.loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=self.loop.run_forever)
+                thread.daemon = True
+                thread.start()
+            return self.loop
+
+    def get(self, key, signature, start, caller, func_name, max_rate=None, default=None):
+        """
+        Called from the UDF: returns the latest value of the subscription of the calling cell, starting it via
+        ``start()`` if there is none or if the arguments (``signature``) changed. Returns ``default`` until the
+        generator yields its first value.
+        """
+        with self.condition:
+            sub = self.subscriptions.get(key, None)
+            if sub is not None and sub.signature != signature:
+                sub.close()
+                sub = None
+            if sub is None:
+                sub = self.subscriptions[key] = Subscription(self, key, signature, caller, func_name, max_rate)
+                new = True
+            else:
+                new = False
+            sub.caller = caller
+        if new:
+            sub.start(start())
+            self.start_dispatcher()
+        with self.condition:
+            sub.dirty = False
+            sub.last_update = time.time()
+            if sub.error is not None:
+                raise sub.error
+            return sub.value if sub.has_value else default
+
+    def push(self, sub, value=None, error=None):
+        """Called from the producer threads whenever the generator yields a value or fails."""
+        with self.condition:
+            if not sub.active:
+                return
+            if error is None:
+                sub.value = value
+                sub.has_value = True
+            else:
+                sub.error = error
+            sub.dirty = True
+            self.condition.notify()
+
+    def unsubscribe(self, key):
+        with self.condition:
+            sub = self.subscriptions.pop(key, None)
+        if sub is not None:
+            sub.close()
+
+    def start_dispatcher(self):
+        with self.condition:
+            if self.dispatcher is None:
+                self.dispatcher = threading.Thread(target=self._dispatch)
+                self.dispatcher.daemon = True
+                self.dispatcher.start()
+
+    def _dispatch(self):
+        from .server import add_idle_task
+        with self.condition:
+            while True:
+                now = time.time()
+                timeout = None
+                pending = [sub for sub in self.subscriptions.values() if sub.dirty and not sub.queued]
+                if pending:
+                    wait = max(
+                        self.last_dispatch + (1. / self.max_rate if self.max_rate else 0.) - now,
+                        min(sub.last_update + sub.interval for sub in pending) - now
+                    )
+                    if wait <= 0:
+                        for sub in pending:
+                            if sub.last_update + sub.interval <= now:
+                                sub.queued = True
+                        self.last_dispatch = now
+                        add_idle_task(StreamUpdate(self))
+                        continue
+                    timeout = wait
+                if self.subscriptions:
+                    wait = self.last_sweep + SWEEP_INTERVAL - now
+                    if wait <= 0:
+                        self.sweep = True
+                        self.last_sweep = now
+                        add_idle_task(StreamUpdate(self))
+                        continue
+                    timeout = wait if timeout is None else min(timeout, wait)
+                self.condition.wait(timeout)
+
+    def update(self):
+        """Runs on the UDF server's thread."""
+        with self.condition:
+            subs = list(self.subscriptions.values())
+            sweep, self.sweep = self.sweep, False
+            due = [sub for sub in subs if sub.queued]
+            for sub in due:
+                sub.queued = False
+        try:
+            for sub in (subs if sweep else due):
+                try:
+                    if not sub.has_formula():
+                        self.unsubscribe(sub.key)
+                except Exception:
+                    # e.g. Excel is busy: the formula is checked again with the next update
+                    pass
+            for sub in due:
+                if sub.active:
+                    try:
+                        sub.caller.Calculate()
+                    except Exception:
+                        # the cell stays dirty and is due again with the next dispatch
+                        pass
+        finally:
+            with self.condition:
+                # cells that have been recalculated are not dirty anymore, the others may need another attempt
+                self.condition.notify()
+
+
+streams = StreamManager()
@@ -32,6 +32,52 @@ class TestApps(TestBase):
         self.assertEqual(xw.apps[0], xw.apps(1))
 
 
+class Stub(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+@unittest.skipUnless(sys.platform.startswith('win'), 'Windows only')
+class TestAppsCache(unittest.TestCase):
+    # Excel instances are stood in for by their window handles, nothing is sent to Excel
+    def setUp(self):
+        from xlwings import _xlwindows
+        self.xlwindows = _xlwindows
+        self.hwnds = [101, 102]
+        self.saved = _xlwindows.get_excel_hwnds, _xlwindows.win32process, _xlwindows.windll
+        _xlwindows.get_excel_hwnds = lambda: iter(self.hwnds)
+        _xlwindows.win32process = Stub(GetWindowThreadProcessId=lambda hwnd: (0, hwnd))
+        _xlwindows.windll = Stub(user32=Stub(IsWindow=lambda hwnd: hwnd in self.hwnds))
+        self.apps = _xlwindows.Apps()
+
+    def tearDown(self):
+        self.xlwindows.get_excel_hwnds, self.xlwindows.win32process, self.xlwindows.windll = self.saved
+
+    def test_iter(self):
+        self.assertEqual([app._hwnd for app in self.apps], [101, 102])
+
+    def test_iter_after_invalidate(self):
+        list(self.apps)
+        self.apps.invalidate()
+        self.assertEqual([app._hwnd for app in self.apps], [101, 102])
+
+    def test_new_instance(self):
+        list(self.apps)
+        self.hwnds.append(103)
+        self.apps.invalidate()
+        self.assertEqual([app._hwnd for app in self.apps], [101, 102, 103])
+
+    def test_known_instances_are_kept(self):
+        app = self.apps[0]
+        self.apps.invalidate()
+        self.assertIs(self.apps[0], app)
+
+    def test_closed_instance(self):
+        list(self.apps)
+        self.hwnds.remove(101)
+        self.assertEqual([app._hwnd for app in self.apps], [102])
+
+
 class TestApp(TestBase):
     def test_activate(self):
         if sys.platform.startswith('win') and self.app1.version.major > 14:
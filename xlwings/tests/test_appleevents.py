@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import sys
+import unittest
+
+from xlwings.utils import address_to_coords, cell_address
+
+if sys.platform.startswith('darwin'):
+    from xlwings import _xlmac
+
+
+# These tests don't need Excel: the Mac tests count the AppleEvents that are sent to a stand-in appscript reference
+
+class Events(object):
+    def __init__(self):
+        self.sent = []
+
+
+class Reference(object):
+    """Mimics an appscript reference: indexing and attributes build references, calling one sends an event."""
+
+    def __init__(self, events, path='', address=None):
+        self.events = events
+        self.path = path
+        self.address = address
+
+    def __getitem__(self, item):
+        return Reference(self.events, '%s[%r]' % (self.path, item), address=item)
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return Reference(self.events, '%s.%s' % (self.path, name), address=self.address)
+
+    def __call__(self, *args, **kwargs):
+        self.events.append(self.path)
+        if self.path.endswith('get_address'):
+            return self.address
+        return 1
+
+
+class Sheet(object):
+    def __init__(self, events):
+        self.xl = Reference(events)
+
+
+class TestAddresses(unittest.TestCase):
+    def test_cell_address(self):
+        self.assertEqual(cell_address(3, 2), '$B$3')
+        self.assertEqual(cell_address(1, 16384), '$XFD$1')
+        self.assertRaises(IndexError, cell_address, 0, 1)
+
+    def test_address_to_coords(self):
+        self.assertEqual(address_to_coords('A1'), (1, 1, 1, 1))
+        self.assertEqual(address_to_coords('$B$2:$D$5'), (2, 2, 4, 3))
+        self.assertEqual(address_to_coords('d5:b2'), (2, 2, 4, 3))
+        self.assertEqual(address_to_coords('$AA$10'), (10, 27, 1, 1))
+        for address in ['MyName', '$1:$3', '$A:$C', 'A1:B2,C3', 'Sheet1!A1', 'XFE1', 'ZZZ1', 'A1:XFE2']:
+            self.assertIsNone(address_to_coords(address))
+        self.assertEqual(address_to_coords('XFD1'), (1, 16384, 1, 1))
+
+
+@unittest.skipUnless(sys.platform.startswith('darwin'), 'Mac only')
+class TestAppleEvents(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.sheet = Sheet(self.events)
+
+    def test_range_from_coords(self):
+        r = _xlmac.Range(self.sheet, (2, 2, 4, 3))
+        self.assertEqual(r.shape, (4, 3))
+        self.assertEqual(r.xl.address, '$B$2:$D$5')
+        self.assertEqual(self.events, [])
+
+    def test_range_from_address(self):
+        r = _xlmac.Range(self.sheet, 'B2:D5')
+        self.assertEqual((r.row, r.column, r.shape), (2, 2, (4, 3)))
+        self.assertEqual(self.events, [])
+
+    def test_range_from_name(self):
+        r = _xlmac.Range(self.sheet, '$B$2:$D$5')
+        r._coords = None
+        self.assertEqual(r.coords, (2, 2, 4, 3))
+        self.assertEqual(r.coords, (2, 2, 4, 3))
+        self.assertEqual(len(self.events), 1)
+
+    def test_cell_of_range(self):
+        r = _xlmac.Range(self.sheet, 'B2:D5')(2, 3)
+        self.assertEqual(r.coords, (3, 4, 1, 1))
+        self.assertEqual(self.events, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
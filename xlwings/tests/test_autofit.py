@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import datetime as dt
+import unittest
+
+from xlwings.utils import format_value, get_text_widths, estimate_column_width
+
+
+# These tests don't need Excel: they only check the estimation of column widths for autofit(method='estimate')
+
+class TestFormatValue(unittest.TestCase):
+    def test_general(self):
+        self.assertEqual(format_value(1.), '1')
+        self.assertEqual(format_value(1 / 3.), '0.3333333333')
+        self.assertEqual(format_value(True), 'TRUE')
+        self.assertEqual(format_value('text'), 'text')
+        self.assertIsNone(format_value(None))
+
+    def test_number_formats(self):
+        self.assertEqual(format_value(1234.5678, '#,##0.00'), '1,234.57')
+        self.assertEqual(format_value(0.256, '0.0%'), '25.6%')
+        self.assertEqual(format_value(3., '0 "items"'), '3 items')
+        self.assertEqual(format_value(-1234567., '[Red]#,##0;(#,##0)'), '-1,234,567')
+
+    def test_scientific(self):
+        self.assertEqual(format_value(3., '0.00E+00'), '3.00E+00')
+        self.assertEqual(format_value(0.00123, '0.00E+00'), '1.23E-03')
+        self.assertEqual(format_value(12345., '0.0E-0'), '1.2E4')
+        self.assertEqual(format_value(2.5, '0.0E+00 "m"'), '2.5E+00 m')
+
+    def test_fractions(self):
+        self.assertEqual(format_value(1.25, '# ?/?'), '1 1/4')
+        self.assertEqual(format_value(0.5, '# ?/?'), ' 1/2')
+        self.assertEqual(format_value(2., '# ?/?'), '2    ')
+        self.assertEqual(format_value(-1.75, '# ?/?'), '-1 3/4')
+        self.assertEqual(format_value(3.14159, '# ??/??'), '3 14/99')
+        self.assertEqual(format_value(1.3, '# ?/8'), '1 2/8')
+        self.assertEqual(format_value(0.75, '?/? "in"'), '3/4 in')
+
+    def test_dates(self):
+        self.assertEqual(format_value(dt.datetime(2016, 9, 20)), '2016-09-20')
+        self.assertEqual(format_value(dt.datetime(2016, 9, 20, 10, 30)), '2016-09-20 10:30')
+        self.assertEqual(format_value(42633., 'dd/mm/yyyy'), 'dd/mm/yyyy')
+
+
+class TestColumnWidth(unittest.TestCase):
+    def test_text_widths(self):
+        self.assertEqual(get_text_widths(['0000', '']), [4., 0.])
+        widths = get_text_widths(['iiii', 'WWWW', '日本'])
+        self.assertTrue(widths[0] < 4. < widths[1])
+        self.assertEqual(widths[2], 4.)
+
+    def test_widest_value(self):
+        self.assertEqual(estimate_column_width(['a', 'abc', None]), estimate_column_width(['abc']))
+        self.assertTrue(estimate_column_width(['abc', 'a\nabcdef']) > estimate_column_width(['abc']))
+
+    def test_empty_column(self):
+        self.assertIsNone(estimate_column_width([None, '']))
+
+
+if __name__ == '__main__':
+    unittest.main()
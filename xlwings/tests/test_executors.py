@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import os
+import sys
+import time
+import unittest
+
+from xlwings.executors import call_with_timeout, ThreadTask, ProcessExecutor, UDFTimeout
+
+
+# These tests don't need Excel: the functions below are run in threads and worker processes
+
+def double(x):
+    return 2 * x
+
+
+def fail():
+    raise ValueError('failed')
+
+
+def sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def pid():
+    return os.getpid()
+
+
+class TestThreads(unittest.TestCase):
+    def test_call_with_timeout(self):
+        self.assertEqual(call_with_timeout(double, (2,), 5), 4)
+        self.assertRaises(ValueError, call_with_timeout, fail, (), 5)
+
+    def test_timeout(self):
+        start = time.time()
+        self.assertRaises(UDFTimeout, call_with_timeout, sleep, (5,), 0.2)
+        self.assertTrue(time.time() - start < 2)
+
+    def test_task(self):
+        task = ThreadTask(double, (2,))
+        called = []
+        task.add_done_callback(lambda: called.append(True))
+        task.run()
+        self.assertTrue(task.done())
+        self.assertEqual(task.result(), 4)
+        self.assertEqual(called, [True])
+
+    def test_task_cancelled_before_start(self):
+        task = ThreadTask(double, (2,))
+        task.cancel()
+        task.run()
+        self.assertTrue(task.done())
+        self.assertRaises(Exception, task.result)
+
+
+@unittest.skipUnless(sys.platform.startswith('win'), 'the workers import the UDF modules like the UDF server')
+class TestProcessExecutor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessExecutor(n_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def test_call(self):
+        self.assertEqual(self.executor.call(__name__, 'double', (21,)), 42)
+        self.assertNotEqual(self.executor.call(__name__, 'pid', ()), os.getpid())
+
+    def test_error(self):
+        self.assertRaises(Exception, self.executor.call, __name__, 'fail', ())
+        self.assertEqual(self.executor.call(__name__, 'double', (1,)), 2)
+
+    def test_timeout(self):
+        self.assertRaises(UDFTimeout, self.executor.call, __name__, 'sleep', (10,), 0.5)
+        # the worker that has been killed is replaced
+        self.assertEqual(self.executor.call(__name__, 'double', (1,)), 2)
+
+    def test_submit(self):
+        self.executor.warm_up(__name__)
+        start = time.time()
+        tasks = [self.executor.submit(__name__, 'sleep', (0.5,)) for _ in range(2)]
+        while not all(task.done() for task in tasks):
+            time.sleep(0.01)
+        # both workers run at the same time
+        self.assertTrue(time.time() - start < 0.9)
+        self.assertEqual([task.result() for task in tasks], [0.5, 0.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,6 +16,18 @@ class TestNames(TestBase):
         self.wb1.sheets[0].range('B2:D10').name = 'test1'
         self.assertTrue('test1' in self.wb1.names)
 
+    def test_cache_names(self):
+        names = self.wb1.names.cache_names()
+        self.assertFalse(names.contains('test1'))
+        names.add('test1', '=Sheet1!$A$1')
+        self.wb1.sheets[0].range('B2').name = 'test2'
+        self.assertTrue(names.contains('test1'))
+        self.assertEqual(names('test2').name, 'test2')
+        names['test1'].delete()
+        self.assertFalse(names.contains('test1'))
+        self.assertRaises(KeyError, names, 'test1')
+        self.assertEqual(names('test2').refers_to, '=Sheet1!$B$2')
+
     def test_len(self):
         self.wb1.sheets[0].range('B2:D10').name = 'test1'
         self.wb1.sheets[0].range('A1').name = 'test2'
@@ -33,6 +45,16 @@ class TestNames(TestBase):
             if ix == 1:
                 self.assertEqual(n.name, 'test2')
 
+    def test_to_dict(self):
+        self.wb1.sheets[0].range('B2:D10').name = 'test1'
+        self.wb1.sheets[0].range('A1').name = 'test2'
+        self.assertEqual(self.wb1.names.to_dict(), {'test1': '=Sheet1!$B$2:$D$10', 'test2': '=Sheet1!$A$1'})
+
+    def test_update(self):
+        self.wb1.sheets[0].range('A1').name = 'test1'
+        self.wb1.names.update({'test1': '=Sheet1!$B$2', 'test2': '=Sheet1!$C$3'})
+        self.assertEqual(self.wb1.names.to_dict(), {'test1': '=Sheet1!$B$2', 'test2': '=Sheet1!$C$3'})
+
     def test_get_inexisting_name(self):
         self.assertIsNone(self.wb1.sheets[0].range('A1').name)
 
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import io
+import os
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+
+from xlwings.profiling import Histogram, UDFProfiler
+
+
+# These tests don't need Excel: they only check the statistics that the UDF server collects
+
+class TestHistogram(unittest.TestCase):
+    def test_empty(self):
+        h = Histogram()
+        self.assertEqual(h.percentile(50), 0.)
+        self.assertEqual(h.summary()['count'], 0)
+        self.assertEqual(h.summary()['max'], 0.)
+
+    def test_percentiles(self):
+        h = Histogram()
+        # 1 ms ... 1 s
+        for i in range(1, 1001):
+            h.record(i / 1000.)
+        self.assertEqual(h.count, 1000)
+        self.assertAlmostEqual(h.mean, 0.5005)
+        self.assertEqual(h.min, 0.001)
+        self.assertEqual(h.max, 1.)
+        for p in [50, 90, 99]:
+            expected = p / 100.
+            # the upper bound of the bucket is at most 1 / sub_buckets off
+            self.assertTrue(expected <= h.percentile(p) <= expected * (1 + 1. / h.sub_buckets) + 1e-6)
+        self.assertEqual(h.percentile(100), 1.)
+
+    def test_single_value(self):
+        h = Histogram()
+        h.record(0.0123)
+        summary = h.summary()
+        self.assertEqual(summary['p50'], 0.0123)
+        self.assertEqual(summary['p99'], 0.0123)
+
+
+class TestUDFProfiler(unittest.TestCase):
+    def setUp(self):
+        self.profiler = UDFProfiler()
+        self.profiler.record('fast', 0.001, 0.002, 0.001, 1)
+        self.profiler.record('slow', 0.001, 0.5, 0.001, 10)
+        self.profiler.record('slow', 0.001, 0.3, 0.001, 10)
+        self.profiler.record_error('slow')
+        self.profiler.record_timeout('slow')
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_report(self):
+        report = self.profiler.report()
+        self.assertEqual([s['function'] for s in report], ['slow', 'fast'])
+        slow = report[0]
+        self.assertEqual((slow['calls'], slow['errors'], slow['timeouts'], slow['cells']), (2, 1, 1, 20))
+        self.assertAlmostEqual(slow['latency']['call']['mean'], 0.4)
+        self.assertEqual(slow['latency']['total']['max'], 0.502)
+
+    def test_disabled_and_reset(self):
+        self.profiler.enabled = False
+        self.profiler.record('fast', 0.001, 0.002, 0.001, 1)
+        self.assertEqual(self.profiler.report()[1]['calls'], 1)
+        self.profiler.reset()
+        self.assertEqual(self.profiler.report(), [])
+
+    def test_table(self):
+        table = self.profiler.table()
+        self.assertEqual(table[0], UDFProfiler.columns)
+        self.assertEqual(table[1][:5], ['slow', 2, 1, 1, 10.])
+        self.assertAlmostEqual(table[1][5], 402.)
+
+    def test_to_csv(self):
+        path = os.path.join(self.tempdir, 'stats.csv')
+        self.profiler.to_csv(path)
+        with io.open(path, newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], UDFProfiler.columns)
+        self.assertEqual([row[0] for row in rows[1:]], ['slow', 'fast'])
+        self.assertEqual(rows[1][1], '2')
+
+    def test_to_json(self):
+        path = os.path.join(self.tempdir, 'stats.json')
+        self.profiler.to_json(path)
+        with open(path) as f:
+            report = json.load(f)
+        self.assertEqual(report, json.loads(json.dumps(self.profiler.report())))
+
+
+if __name__ == '__main__':
+    unittest.main()
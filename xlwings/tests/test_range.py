@@ -13,6 +13,16 @@ from xlwings.tests.common import TestBase, this_dir
 if sys.platform.startswith('darwin'):
     from appscript import k as kw
 
+# Optional dependencies
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
 
 class TestRangeInstantiation(TestBase):
     def test_range1(self):
@@ -827,5 +837,42 @@ class TestRangeExpansion(TestBase):
         ])
 
 
+class TestView(TestBase):
+    def test_chunks(self):
+        sht = self.wb1.sheets[1]
+        data = [[float(i), float(i * 2)] for i in range(10)]
+        xw.view(data, sheet=sht, chunksize=3)
+        self.assertEqual(sht.range('A1').expand().value, data)
+        self.assertTrue(self.app1.screen_updating)
+        self.assertEqual(self.app1.calculation, 'automatic')
+
+    def test_max_rows(self):
+        sht = self.wb1.sheets[1]
+        data = [[float(i), float(i * 2)] for i in range(10)]
+        xw.view(data, sheet=sht, max_rows=4, chunksize=3)
+        self.assertEqual(sht.range('A1').expand().value, data[:4])
+
+    def test_other_objects(self):
+        sht = self.wb1.sheets[1]
+        xw.view([1., 2., 3.], sheet=sht, max_rows=2)
+        self.assertEqual(sht.range('A1:C1').value, [1., 2., 3.])
+
+    @unittest.skipIf(np is None, 'numpy missing')
+    def test_array(self):
+        sht = self.wb1.sheets[1]
+        xw.view(np.arange(20.).reshape(10, 2), sheet=sht, max_rows=7, chunksize=3)
+        self.assertEqual(sht.range('A1').expand().value, np.arange(14.).reshape(7, 2).tolist())
+
+    @unittest.skipIf(pd is None, 'pandas missing')
+    def test_dataframe(self):
+        sht = self.wb1.sheets[1]
+        df = pd.DataFrame({'a': range(10), 'b': range(10, 20)}, columns=['a', 'b'], dtype=float)
+        xw.view(df, sheet=sht, max_rows=5, chunksize=2)
+        # only the first chunk has a header
+        self.assertEqual(sht.range('A1:C1').value, [None, 'a', 'b'])
+        self.assertEqual(sht.range('B2').expand().value, df.values[:5].tolist())
+        self.assertIsNone(sht.range('A7').value)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -4,6 +4,7 @@ import os
 import unittest
 
 import xlwings as xw
+from xlwings import utils
 from xlwings.tests.common import TestBase, this_dir
 
 try:
@@ -18,6 +19,19 @@ except ImportError:
     PIL = None
 
 
+# add_many renders in worker processes, which need figure functions at the top level of a module
+def line_figure():
+    fig = plt.figure()
+    plt.plot([-1, 1, -2, 2, -3, 3, 2])
+    return fig
+
+
+def bar_figure():
+    fig = plt.figure()
+    plt.bar([1, 2, 3], [3, 1, 2])
+    return fig
+
+
 class TestShape(TestBase):
     def test_name(self):
         filename = os.path.join(this_dir, 'sample_picture.png')
@@ -134,6 +148,24 @@ class TestPicture(TestBase):
         pic1 = self.wb1.sheets[0].pictures.add(filename, name='pic1')
         pic1.update(filename)
 
+    def test_picture_update_same_image(self):
+        filename = os.path.join(this_dir, 'sample_picture.png')
+        pic1 = self.wb1.sheets[0].pictures.add(filename, name='pic1')
+        self.assertIs(pic1.update(filename), pic1)
+        # the digest follows the picture
+        pic1.name = 'pic2'
+        pic2 = self.wb1.sheets[0].pictures['pic2']
+        self.assertIs(pic2.update(filename), pic2)
+
+    def test_picture_update_after_change_in_excel(self):
+        filename = os.path.join(this_dir, 'sample_picture.png')
+        pic1 = self.wb1.sheets[0].pictures.add(filename, name='pic1')
+        pic1.impl.alternative_text = ''
+        pic2 = pic1.update(filename)
+        self.assertIsNot(pic2, pic1)
+        self.assertEqual(pic2.name, 'pic1')
+        self.assertEqual(len(self.wb1.sheets[0].pictures), 1)
+
     def test_picture_auto_update(self):
         filename = os.path.join(this_dir, 'sample_picture.png')
         pic1 = self.wb1.sheets[0].pictures.add(filename, name='pic1', update=True)
@@ -170,6 +202,23 @@ class TestPicture(TestBase):
         pic1 = self.wb1.sheets[0].pictures.add(filename, name='pic 1')
         self.assertTrue('pic 1' in self.wb1.sheets[0].pictures)
 
+    def test_cache_names(self):
+        filename = os.path.join(this_dir, 'sample_picture.png')
+        pictures = self.wb1.sheets[0].pictures.cache_names()
+        self.assertFalse('pic1' in pictures)
+        pictures.add(filename, name='pic1')
+        pictures.add(filename, name='pic2')
+        self.assertTrue('pic1' in pictures)
+        self.assertEqual(pictures['pic2'].name, 'pic2')
+        pictures['pic1'].name = 'renamed'
+        self.assertFalse('pic1' in pictures)
+        self.assertTrue('renamed' in pictures)
+        pictures['renamed'].delete()
+        self.assertFalse('renamed' in pictures)
+        self.assertEqual(pictures['pic2'].name, 'pic2')
+        shapes = self.wb1.sheets[0].shapes.cache_names()
+        self.assertEqual(shapes['pic2'].name, 'pic2')
+
 
 @unittest.skipIf(mpl is None, 'matplotlib missing')
 class TestMatplotlib(TestBase):
@@ -185,6 +234,24 @@ class TestMatplotlib(TestBase):
         self.wb1.sheets[0].pictures.add(fig, name='Test1')
         self.assertEqual(self.wb1.sheets[0].pictures[0].name, 'Test1')
 
+    def test_add_many(self):
+        pics = self.wb1.sheets[0].pictures.add_many([('Line', line_figure), ('Bar', bar_figure)])
+        self.assertEqual([pic.name for pic in pics], ['Line', 'Bar'])
+        # existing pictures are updated
+        self.wb1.sheets[0].pictures.add_many({'Line': line_figure, 'Bar': bar_figure})
+        self.assertEqual(len(self.wb1.sheets[0].pictures), 2)
+
+    def test_render_pool_is_reused(self):
+        utils.render_figures([line_figure, bar_figure], 2)
+        pool = utils._render_pool[1]
+        utils.render_figures([line_figure, bar_figure], 2)
+        self.assertIs(utils._render_pool[1], pool)
+
+    def test_render_unpicklable_in_process(self):
+        rendered = utils.render_figures([lambda: line_figure(), lambda: bar_figure()], 2)
+        self.assertEqual(len(rendered), 2)
+        self.assertTrue(all(data.startswith(b'\x89PNG') for data, width, height in rendered))
+
 
 class TestCharts(TestBase):
     def test_add_properties(self):
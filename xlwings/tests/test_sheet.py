@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 import sys
+import threading
 import unittest
 
 import xlwings as xw
+from xlwings.main import _get_pinned
 from xlwings.tests.common import TestBase
 
 
@@ -55,6 +57,21 @@ class TestSheets(TestBase):
         with self.assertRaises(Exception):
             self.wb1.sheets.add('Sheet1')
 
+    def test_cache_names(self):
+        sheets = self.wb1.sheets.cache_names()
+        self.assertTrue('sheet1' in sheets)
+        self.assertEqual(sheets('Sheet2').name, 'Sheet2')
+        # adding, renaming and deleting through xlwings rebuilds the map
+        sheets.add('New')
+        self.assertEqual(sheets['New'].name, 'New')
+        sheets['New'].name = 'Renamed'
+        self.assertFalse('New' in sheets)
+        self.assertEqual(sheets['Renamed'].name, 'Renamed')
+        sheets['Sheet1'].delete()
+        self.assertFalse('Sheet1' in sheets)
+        self.assertRaises(KeyError, sheets, 'Sheet1')
+        self.assertEqual(sheets['Sheet2'].name, 'Sheet2')
+
 
 class TestSheet(TestBase):
     def test_name(self):
@@ -137,5 +154,46 @@ class TestSheet(TestBase):
         self.assertFalse('Sheet1' in [i.name for i in self.wb1.sheets])
 
 
+class TestUse(TestBase):
+    def test_use(self):
+        sht = self.wb1.sheets[1]
+        with xw.use(sht) as pinned:
+            self.assertEqual(pinned, sht)
+            xw.Range('A1').value = 1
+            xw.Range((2, 1)).value = 2
+            self.assertEqual(xw.sheets.active, sht)
+            self.assertEqual(xw.books.active, self.wb1)
+        self.assertEqual(sht.range('A1:A2').value, [1., 2.])
+        self.assertIsNone(_get_pinned())
+
+    def test_nested(self):
+        outer, inner = self.wb1.sheets[1], self.wb2.sheets[2]
+        with xw.use(outer):
+            with xw.use(inner):
+                xw.Range('A1').value = 'inner'
+                self.assertEqual(xw.books.active, self.wb2)
+            xw.Range('A1').value = 'outer'
+            self.assertEqual(xw.sheets.active, outer)
+        self.assertEqual(inner.range('A1').value, 'inner')
+        self.assertEqual(outer.range('A1').value, 'outer')
+
+    def test_exception(self):
+        with self.assertRaises(ValueError):
+            with xw.use(self.wb1.sheets[1]):
+                raise ValueError()
+        self.assertIsNone(_get_pinned())
+
+    def test_threads(self):
+        # the binding only applies to the thread that entered the block
+        seen = []
+        sht = self.wb1.sheets[1]
+        with xw.use(sht):
+            thread = threading.Thread(target=lambda: seen.append(_get_pinned()))
+            thread.start()
+            thread.join()
+            self.assertEqual(_get_pinned()[0], sht)
+        self.assertEqual(seen, [None])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import sys
+import datetime as dt
+import unittest
+
+from xlwings.transport import encode, decode, start_server, Client, Handle, RemoteError
+
+# Optional dependencies
+try:
+    import numpy as np
+    from numpy.testing import assert_array_equal
+except ImportError:
+    np = None
+
+
+# These tests don't need Excel: they run the dispatcher over a local socket
+
+def add(x, y):
+    return x + y
+
+
+def roundtrip(value):
+    out = []
+    encode(value, out)
+    return decode(b''.join(out))[0]
+
+
+class TestEncoding(unittest.TestCase):
+    def test_scalars(self):
+        for value in [None, True, False, 0, -1, 2 ** 62, 2 ** 70, 1.5, 'text', 'ünicode', b'bytes',
+                      dt.datetime(2016, 9, 20, 10, 30), dt.datetime(2016, 9, 20, 10, 30, 0, 123)]:
+            self.assertEqual(roundtrip(value), value)
+
+    def test_containers(self):
+        value = [1, (2., 'a'), {'k': [None, True]}, Handle(3)]
+        self.assertEqual(roundtrip(value), value)
+        self.assertIsInstance(roundtrip((1, 2)), tuple)
+
+    @unittest.skipIf(np is None, 'numpy missing')
+    def test_ndarray(self):
+        for a in [np.arange(12.).reshape(3, 4), np.arange(12).reshape(3, 4).T, np.array([1 + 2j]), np.array(5.)]:
+            b = roundtrip(a)
+            self.assertEqual(b.dtype, a.dtype)
+            assert_array_equal(b, a)
+
+    def test_unsupported(self):
+        self.assertRaises(TypeError, roundtrip, object())
+
+
+class TestDispatcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = start_server()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.client = Client(self.server.server_address, self.server.token)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_call(self):
+        math = self.client.Module('math')
+        self.assertEqual(self.client.Var(self.client.Call(math, 'sqrt', (4,))), 2.)
+
+    def test_module_reload(self):
+        math = self.client.Module('math', True)
+        self.assertEqual(self.client.Var(self.client.Call(math, 'sqrt', (4,))), 2.)
+
+    def test_call_plain_function(self):
+        self.assertEqual(self.client.CallUDF('xlwings.tests.test_transport', 'add', [1, 2]), 3)
+
+    @unittest.skipUnless(sys.platform.startswith('win'), 'UDFs are only supported on Windows')
+    def test_call_udf(self):
+        result = self.client.CallUDF('xlwings.tests.test_udfs', 'double_sum', [1, 2])
+        self.assertEqual([list(row) for row in result], [[6.]])
+
+    def test_containers(self):
+        lst = self.client.List(1, 2, 3)
+        self.assertEqual(self.client.Len(lst), 3)
+        self.assertTrue(self.client.Contains(lst, 2))
+        self.assertEqual(self.client.Var(self.client.GetItem(lst, 0)), 1)
+        d = self.client.Dict('a', 1)
+        self.assertEqual(self.client.Var(d, True), (('a', 1),))
+
+    def test_release(self):
+        lst = self.client.List(1)
+        self.client.Release(lst)
+        self.assertRaises(RemoteError, self.client.Len, lst)
+
+    def test_error(self):
+        self.assertRaises(RemoteError, self.client.Module, 'no_such_module')
+        self.assertRaises(RemoteError, self.client.call, 'NoSuchMethod')
+
+    def test_wrong_token(self):
+        self.assertRaises(RemoteError, Client, self.server.server_address, 'wrong')
+
+
+if __name__ == '__main__':
+    unittest.main()
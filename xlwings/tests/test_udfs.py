@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+import time
+import unittest
+
+import pywintypes
+
+import xlwings as xw
+from xlwings.udfs import (generate_vba_udf, parse_vba_udfs, xlfunc_to_manifest, VBA_MODULE_HEADER, ObjectStore,
+                          Recalculate, vectorized_results)
+from xlwings.streaming import StreamManager
+from xlwings.server import IdleQueue, BUSY_RETRY_DELAY
+
+
+# These tests only generate and parse VBA code and don't need a running Excel instance
+
+@xw.func
+def double_sum(x, y):
+    """Returns twice the sum of the two arguments"""
+    return 2 * (x + y)
+
+
+def renamed_double_sum():
+    # the same UDF after its arguments have been renamed
+    @xw.func
+    def double_sum(a, b):
+        """Returns twice the sum of the two arguments"""
+        return 2 * (a + b)
+    return double_sum
+
+
+@xw.func
+@xw.arg('xl_app', vba='Application')
+def varargs(xl_app, *args):
+    return len(args)
+
+
+class TestVBAGeneration(unittest.TestCase):
+    def test_function_code(self):
+        code = generate_vba_udf('mymodule', double_sum.__xlfunc__)
+        lines = code.splitlines()
+        self.assertTrue(lines[0].startswith("'xlwings-udf: double_sum "))
+        self.assertEqual(lines[1], 'Function double_sum(x, y)')
+        self.assertIn('Py.CallUDF("mymodule", "double_sum", Array(x, y), ThisWorkbook, Application.Caller)', code)
+        self.assertEqual(lines[-1], 'End Function')
+
+    def test_vararg_code(self):
+        code = generate_vba_udf('mymodule', varargs.__xlfunc__)
+        self.assertIn('Function varargs(ParamArray args())', code)
+        self.assertIn('Application', code)
+
+    def test_hash_is_stable(self):
+        self.assertEqual(generate_vba_udf('mymodule', double_sum.__xlfunc__),
+                         generate_vba_udf('mymodule', double_sum.__xlfunc__))
+
+    def test_hash_changes_with_signature(self):
+        renamed = renamed_double_sum()
+        self.assertEqual(renamed.__xlfunc__['name'], double_sum.__xlfunc__['name'])
+        h1 = generate_vba_udf('mymodule', double_sum.__xlfunc__).splitlines()[0]
+        h2 = generate_vba_udf('mymodule', renamed.__xlfunc__).splitlines()[0]
+        self.assertNotEqual(h1, h2)
+
+    def test_hash_changes_with_module(self):
+        self.assertNotEqual(generate_vba_udf('mymodule', double_sum.__xlfunc__).splitlines()[0],
+                            generate_vba_udf('othermodule', double_sum.__xlfunc__).splitlines()[0])
+
+    def test_parse(self):
+        code1 = generate_vba_udf('mymodule', double_sum.__xlfunc__)
+        code2 = generate_vba_udf('mymodule', varargs.__xlfunc__)
+        code = VBA_MODULE_HEADER + code1 + '\n' + code2
+        udfs = parse_vba_udfs(code.replace('\n', '\r\n'))
+        self.assertEqual([udf[0] for udf in udfs], ['double_sum', 'varargs'])
+        self.assertEqual(udfs[0][1], code1.split()[2])
+        self.assertEqual(udfs[0][2], 2)
+        self.assertEqual(udfs[0][3], len(code1.splitlines()))
+        self.assertEqual(udfs[1][2], 3 + len(code1.splitlines()))
+
+    def test_parse_legacy_module(self):
+        # modules that were generated by older versions don't have hashes and are imported from scratch
+        self.assertEqual(parse_vba_udfs(VBA_MODULE_HEADER + 'Function f()\nEnd Function\n'), [])
+
+
+class TestManifest(unittest.TestCase):
+    def test_manifest_generates_same_code(self):
+        for f in [double_sum, varargs]:
+            xlfunc = json.loads(json.dumps(xlfunc_to_manifest(f.__xlfunc__)))
+            self.assertEqual(generate_vba_udf('mymodule', xlfunc), generate_vba_udf('mymodule', f.__xlfunc__))
+
+
+class Caller(object):
+    """Stands in for the COM object of a calling cell."""
+
+    def __init__(self, address, formula):
+        self.address = address
+        self.formula = formula
+
+    def GetAddress(self, *args):
+        return self.address
+
+    def Cells(self, row, column):
+        if isinstance(self.formula, Exception):
+            raise self.formula
+        return self
+
+    @property
+    def Formula(self):
+        return self.formula
+
+    def Calculate(self):
+        if isinstance(self.formula, Exception):
+            raise self.formula
+        self.calculated = True
+
+
+class TestObjectStore(unittest.TestCase):
+    def setUp(self):
+        self.store = ObjectStore()
+        self.caller = Caller('[Book1.xlsx]Sheet1!$B$2', '=get_object(A1)')
+
+    def test_put_and_get(self):
+        obj = [1, 2]
+        handle = self.store.put(obj, self.caller, 'get_object')
+        self.assertEqual(handle, 'list<1>@Sheet1!B2')
+        self.assertIs(self.store.get(handle), obj)
+        self.assertRaises(Exception, self.store.get, 'list<2>@Sheet1!B2')
+
+    def test_recalculation_replaces_object(self):
+        old = self.store.put([1], self.caller, 'get_object')
+        new = self.store.put([2], self.caller, 'get_object')
+        self.assertEqual(len(self.store), 1)
+        self.assertRaises(Exception, self.store.get, old)
+        self.assertEqual(self.store.get(new), [2])
+
+    def test_sweep(self):
+        other = Caller('[Book1.xlsx]Sheet1!$B$3', '=get_object(A2)')
+        kept = self.store.put([1], self.caller, 'get_object')
+        evicted = self.store.put([2], other, 'get_object')
+        other.formula = '=get_object2(A2)'
+        self.store.sweep()
+        self.assertEqual(self.store.get(kept), [1])
+        self.assertRaises(Exception, self.store.get, evicted)
+
+    def test_sweep_of_closed_book(self):
+        handle = self.store.put([1], self.caller, 'get_object')
+        self.caller.formula = pywintypes.com_error(-2147417848, 'The object invoked has disconnected', None, None)
+        self.store.sweep()
+        self.assertRaises(Exception, self.store.get, handle)
+
+    def test_sweep_while_busy(self):
+        # a rejected call doesn't mean that the formula is gone: the sweep fails and is retried later
+        handle = self.store.put([1], self.caller, 'get_object')
+        self.caller.formula = pywintypes.com_error(-2147418111, 'Call was rejected by callee.', None, None)
+        self.assertRaises(pywintypes.com_error, self.store.sweep)
+        self.assertEqual(self.store.get(handle), [1])
+
+
+class TestVectorized(unittest.TestCase):
+    def test_recalculate(self):
+        callers = [Caller('[Book1.xlsx]Sheet1!$A$%s' % i, '=myfunc(B%s)' % i) for i in range(1, 4)]
+        keys = [('mymodule', 'myfunc', caller.address) for caller in callers]
+        for key in keys:
+            vectorized_results[key] = 1.
+        # the second cell has been deleted, Excel is busy when the third one is recalculated
+        callers[1].formula = pywintypes.com_error(-2146827864, 'Object required', None, None)
+        callers[2].formula = pywintypes.com_error(-2147418111, 'Call was rejected by callee.', None, None)
+        task = Recalculate(list(zip(keys, callers)))
+        self.assertRaises(pywintypes.com_error, task)
+        self.assertTrue(callers[0].calculated)
+        self.assertNotIn(keys[1], vectorized_results)
+        callers[2].formula = '=myfunc(B3)'
+        task()
+        self.assertTrue(callers[2].calculated)
+        self.assertEqual(task.callers, [])
+        for key in keys:
+            vectorized_results.pop(key, None)
+
+
+def ticks():
+    yield 1
+
+
+class TestStreams(unittest.TestCase):
+    def setUp(self):
+        self.streams = StreamManager()
+        self.caller = Caller('[Book1.xlsx]Sheet1!$B$2', '=ticks()+ticks2()')
+
+    def subscribe(self, func_name):
+        key = ('mymodule', func_name, self.caller.address)
+        self.streams.get(key, (), ticks, self.caller, func_name)
+        return key
+
+    def test_functions_of_a_cell(self):
+        key1 = self.subscribe('ticks')
+        key2 = self.subscribe('ticks2')
+        sub = self.streams.subscriptions[key1]
+        self.subscribe('ticks')
+        self.assertIs(self.streams.subscriptions[key1], sub)
+        self.assertIn(key2, self.streams.subscriptions)
+
+    def test_update_while_busy(self):
+        key = self.subscribe('ticks')
+        self.caller.formula = pywintypes.com_error(-2147418111, 'Call was rejected by callee.', None, None)
+        self.streams.subscriptions[key].queued = True
+        self.streams.update()
+        self.assertIn(key, self.streams.subscriptions)
+
+    def test_update_of_deleted_formula(self):
+        key = self.subscribe('ticks')
+        self.caller.formula = '=1'
+        self.streams.subscriptions[key].queued = True
+        self.streams.update()
+        self.assertNotIn(key, self.streams.subscriptions)
+
+
+class Task(object):
+    """An idle task that records its calls and can be made to fail or take some time."""
+
+    def __init__(self, calls, name, key=None, error=None, duration=0.):
+        self.calls = calls
+        self.name = name
+        self.key = key
+        self.error = error
+        self.duration = duration
+
+    def __call__(self):
+        if self.error is not None:
+            raise self.error
+        time.sleep(self.duration)
+        self.calls.append(self.name)
+
+
+class TestIdleQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = IdleQueue()
+        self.calls = []
+
+    def add(self, name, **kwargs):
+        task = Task(self.calls, name, **kwargs)
+        self.queue.add(task)
+        return task
+
+    def test_run_in_order(self):
+        for name in ['a', 'b', 'c']:
+            self.add(name)
+        self.queue.run()
+        self.assertEqual(self.calls, ['a', 'b', 'c'])
+        self.assertEqual(len(self.queue), 0)
+        self.assertIsNone(self.queue.wait_time())
+
+    def test_superseded(self):
+        self.add('old', key='cell')
+        self.add('other')
+        self.add('new', key='cell')
+        self.queue.run()
+        self.assertEqual(self.calls, ['other', 'new'])
+        self.assertEqual(self.queue.stats()['superseded'], 1)
+
+    def test_delay(self):
+        self.queue.add(Task(self.calls, 'later'), delay=0.2)
+        self.assertFalse(self.queue.due())
+        self.queue.run()
+        self.assertEqual(self.calls, [])
+        time.sleep(0.2)
+        self.assertTrue(self.queue.due())
+        self.queue.run()
+        self.assertEqual(self.calls, ['later'])
+
+    def test_requeue_when_busy(self):
+        task = self.add('busy', error=pywintypes.com_error(-2147418111, 'Call was rejected by callee.', None, None))
+        self.add('other')
+        self.queue.run()
+        self.assertEqual(self.calls, ['other'])
+        self.assertEqual(len(self.queue), 1)
+        self.assertFalse(self.queue.due())
+        task.error = None
+        time.sleep(BUSY_RETRY_DELAY)
+        self.queue.run()
+        self.assertEqual(self.calls, ['other', 'busy'])
+
+    def test_requeued_task_superseded(self):
+        self.add('busy', key='cell',
+                 error=pywintypes.com_error(-2147418111, 'Call was rejected by callee.', None, None))
+        entries = [entry for batch in self.queue.pop_all() for entry in batch]
+        self.add('new', key='cell')
+        self.queue.requeue(entries, BUSY_RETRY_DELAY)
+        self.queue.run()
+        self.assertEqual(self.calls, ['new'])
+
+    def test_other_errors_are_dropped(self):
+        self.add('failed', error=ValueError('failed'))
+        self.queue.run()
+        self.assertEqual(len(self.queue), 0)
+
+    def test_budget(self):
+        for name in ['a', 'b', 'c', 'd']:
+            self.add(name, duration=0.05)
+        self.queue.run(budget=0.07)
+        self.assertTrue(0 < len(self.queue) < 4)
+        self.assertTrue(self.queue.due())
+        self.queue.run()
+        self.assertEqual(self.calls, ['a', 'b', 'c', 'd'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,441 @@
+"""
+Serves the methods of the ``XLPython`` COM object (``Call``, ``GetAttr``, ``CallUDF``, ...) over a local TCP socket.
+
+Every message is a 4-byte big-endian length followed by a tagged binary encoding of the value. NumPy arrays with a
+numeric dtype are sent as their raw buffer together with dtype and shape. Objects that the COM server returns by
+reference (via ``ToVariant``) are kept in a handle table of the connection instead and are referenced by ``Handle``
+objects on the client side, until the client releases them or disconnects.
+
+This module only depends on the standard library (NumPy is imported once an array is received), so a client can
+use it on any platform, also where xlwings can't drive Excel. ``CallUDF`` runs functions that are decorated with
+``@xw.func`` through the UDF server's code (Windows only) and calls plain functions with the values as they are::
+
+    from xlwings.transport import start_server, Client
+
+    server = start_server()
+    with Client(server.server_address, server.token) as client:
+        m = client.Module('math')
+        client.Var(client.Call(m, 'sqrt', (2,)))
+"""
+import os
+import sys
+import struct
+import socket
+import binascii
+import threading
+import datetime as dt
+from importlib import import_module
+
+PY3 = sys.version_info[0] == 3
+
+if PY3:
+    import socketserver
+    text_type = str
+    integer_types = (int,)
+    try:
+        from importlib import reload
+    except ImportError:
+        from imp import reload
+else:
+    import SocketServer as socketserver
+    text_type = unicode
+    integer_types = (int, long)
+
+_header = struct.Struct('>I')
+_int64 = struct.Struct('>q')
+_float64 = struct.Struct('>d')
+_uint64 = struct.Struct('>Q')
+
+
+class Handle(object):
+    """Reference to an object in the handle table of the server."""
+
+    def __init__(self, id):
+        self.id = id
+
+    def __repr__(self):
+        return '<Handle %s>' % self.id
+
+    def __eq__(self, other):
+        return isinstance(other, Handle) and other.id == self.id
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class RemoteError(Exception):
+    pass
+
+
+def encode(value, out):
+    """Appends the encoding of ``value`` to ``out``, a list of byte strings."""
+    t = type(value)
+    if value is None:
+        out.append(b'N')
+    elif t is bool:
+        out.append(b'T' if value else b'F')
+    elif t in integer_types:
+        if -2 ** 63 <= value < 2 ** 63:
+            out.append(b'i' + _int64.pack(value))
+        else:
+            s = str(value).encode('ascii')
+            out.append(b'I' + _header.pack(len(s)) + s)
+    elif t is float:
+        out.append(b'd' + _float64.pack(value))
+    elif t is text_type:
+        s = value.encode('utf-8')
+        out.append(b's' + _header.pack(len(s)) + s)
+    elif t is bytes:
+        out.append(b'b' + _header.pack(len(value)) + value)
+    elif t is list or t is tuple:
+        out.append((b'l' if t is list else b't') + _header.pack(len(value)))
+        for item in value:
+            encode(item, out)
+    elif t is dict:
+        out.append(b'D' + _header.pack(len(value)))
+        for k, v in value.items():
+            encode(k, out)
+            encode(v, out)
+    elif t is Handle:
+        out.append(b'h' + _uint64.pack(value.id))
+    elif t is dt.datetime:
+        s = value.isoformat().encode('ascii')
+        out.append(b'z' + _header.pack(len(s)) + s)
+    elif t.__module__ == 'numpy' and t.__name__ == 'ndarray' and value.dtype.kind in 'biufc':
+        if not value.flags['C_CONTIGUOUS']:
+            value = value.copy(order='C')
+        dtype = value.dtype.str.encode('ascii')
+        out.append(b'a' + struct.pack('>B', len(dtype)) + dtype + struct.pack('>B', value.ndim)
+                   + struct.pack('>%dQ' % value.ndim, *value.shape))
+        data = value.tostring() if not hasattr(value, 'tobytes') else value.tobytes()
+        out.append(_uint64.pack(len(data)))
+        out.append(data)
+    elif t.__module__ == 'numpy' and hasattr(value, 'item'):
+        # NumPy scalars
+        encode(value.item(), out)
+    else:
+        raise TypeError("Can't send objects of type %s, use a handle instead" % t.__name__)
+
+
+def decode(buf, pos=0):
+    """Decodes the value that starts at ``buf[pos]`` and returns it together with the position after it."""
+    tag = buf[pos:pos + 1]
+    pos += 1
+    if tag == b'N':
+        return None, pos
+    elif tag == b'T':
+        return True, pos
+    elif tag == b'F':
+        return False, pos
+    elif tag == b'i':
+        return _int64.unpack_from(buf, pos)[0], pos + 8
+    elif tag == b'd':
+        return _float64.unpack_from(buf, pos)[0], pos + 8
+    elif tag in (b's', b'b', b'I', b'z'):
+        n = _header.unpack_from(buf, pos)[0]
+        pos += 4
+        s = buf[pos:pos + n]
+        pos += n
+        if tag == b's':
+            return s.decode('utf-8'), pos
+        elif tag == b'b':
+            return s, pos
+        elif tag == b'I':
+            return int(s.decode('ascii')), pos
+        else:
+            s = s.decode('ascii')
+            fmt = '%Y-%m-%dT%H:%M:%S.%f' if '.' in s else '%Y-%m-%dT%H:%M:%S'
+            return dt.datetime.strptime(s, fmt), pos
+    elif tag in (b'l', b't'):
+        n = _header.unpack_from(buf, pos)[0]
+        pos += 4
+        items = []
+        for _ in range(n):
+            item, pos = decode(buf, pos)
+            items.append(item)
+        return (items if tag == b'l' else tuple(items)), pos
+    elif tag == b'D':
+        n = _header.unpack_from(buf, pos)[0]
+        pos += 4
+        d = {}
+        for _ in range(n):
+            k, pos = decode(buf, pos)
+            v, pos = decode(buf, pos)
+            d[k] = v
+        return d, pos
+    elif tag == b'h':
+        return Handle(_uint64.unpack_from(buf, pos)[0]), pos + 8
+    elif tag == b'a':
+        import numpy as np
+        n = struct.unpack_from('>B', buf, pos)[0]
+        dtype = np.dtype(buf[pos + 1:pos + 1 + n].decode('ascii'))
+        pos += 1 + n
+        ndim = struct.unpack_from('>B', buf, pos)[0]
+        shape = struct.unpack_from('>%dQ' % ndim, buf, pos + 1)
+        pos += 1 + 8 * ndim
+        size = _uint64.unpack_from(buf, pos)[0]
+        pos += 8
+        value = np.frombuffer(buf[pos:pos + size], dtype=dtype).reshape(shape).copy()
+        return value, pos + size
+    else:
+        raise ValueError("Invalid tag %r at position %s" % (tag, pos - 1))
+
+
+def send_message(sock, value):
+    out = []
+    encode(value, out)
+    payload = b''.join(out)
+    sock.sendall(_header.pack(len(payload)) + payload)
+
+
+def _recv_exactly(sock, n):
+    chunks = []
+    while n > 0:
+        chunk = sock.recv(min(n, 1 << 20))
+        if not chunk:
+            raise EOFError()
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_message(sock):
+    n = _header.unpack(_recv_exactly(sock, 4))[0]
+    return decode(_recv_exactly(sock, n))[0]
+
+
+class Dispatcher(object):
+    """
+    The methods of ``server.XLPython`` without COM: arguments that are handles are resolved from the handle table and
+    the methods that return objects by reference return new handles.
+    """
+
+    public_methods = set([
+        'Module', 'Tuple', 'TupleFromArray', 'Dict', 'DictFromArray', 'List', 'ListFromArray', 'Obj', 'Str', 'Var',
+        'Call', 'GetItem', 'SetItem', 'DelItem', 'Contains', 'GetAttr', 'SetAttr', 'DelAttr', 'HasAttr', 'Eval',
+        'Exec', 'Builtin', 'Len', 'Bool', 'CallUDF', 'Release'
+    ])
+
+    def __init__(self):
+        self.handles = {}
+        self.next_id = 1
+
+    def wrap(self, obj):
+        handle = Handle(self.next_id)
+        self.next_id += 1
+        self.handles[handle.id] = obj
+        return handle
+
+    def unwrap(self, value):
+        if isinstance(value, Handle):
+            try:
+                return self.handles[value.id]
+            except KeyError:
+                raise Exception("Invalid handle %s" % value.id)
+        return value
+
+    def dispatch(self, method, args):
+        if method not in self.public_methods:
+            raise AttributeError("Unknown method '%s'" % method)
+        if method != 'Release':
+            args = [self.unwrap(arg) for arg in args]
+        return getattr(self, method)(*args)
+
+    def Release(self, *handles):
+        for handle in handles:
+            self.handles.pop(handle.id, None)
+
+    def Module(self, module, force_reload=False):
+        m = import_module(module)
+        if force_reload:
+            m = reload(m)
+        return self.wrap(m)
+
+    def TupleFromArray(self, elements):
+        return self.Tuple(*elements)
+
+    def Tuple(self, *elements):
+        return self.wrap(tuple(elements))
+
+    def DictFromArray(self, kvpairs):
+        return self.Dict(*kvpairs)
+
+    def Dict(self, *kvpairs):
+        if len(kvpairs) % 2 != 0:
+            raise Exception("Arguments must be alternating keys and values.")
+        return self.wrap(dict(zip(kvpairs[::2], kvpairs[1::2])))
+
+    def ListFromArray(self, elements):
+        return self.List(*elements)
+
+    def List(self, *elements):
+        return self.wrap(list(elements))
+
+    def Obj(self, var):
+        return self.wrap(var)
+
+    def Str(self, obj):
+        return str(obj)
+
+    def Var(self, obj, lax=False):
+        if lax and type(obj) is dict:
+            return tuple(obj.items())
+        return obj
+
+    def Call(self, obj, *args):
+        method = None
+        pargs = ()
+        kwargs = {}
+        for arg in args:
+            if isinstance(arg, tuple):
+                pargs = arg
+            elif isinstance(arg, dict):
+                kwargs = arg
+            else:
+                method = arg
+        if method is None:
+            return self.wrap(obj(*pargs, **kwargs))
+        else:
+            return self.wrap(getattr(obj, method)(*pargs, **kwargs))
+
+    def CallUDF(self, module_name, func_name, args):
+        # Unlike over COM, there are no Excel objects: the arguments are values and there is no calling cell
+        func = getattr(import_module(module_name), func_name)
+        if not hasattr(func, '__xlfunc__'):
+            # a plain function, e.g. where there's no UDF server (which needs pywin32): called with the values as is
+            return func(*args)
+        from .udfs import call_udf
+        return call_udf(module_name, func_name, args, None, None)
+
+    def Len(self, obj):
+        return len(obj)
+
+    def Bool(self, obj):
+        return bool(obj)
+
+    def Builtin(self):
+        return self.wrap(__import__('builtins' if PY3 else '__builtin__'))
+
+    def GetItem(self, obj, key):
+        return self.wrap(obj[key])
+
+    def SetItem(self, obj, key, value):
+        obj[key] = value
+
+    def DelItem(self, obj, key):
+        del obj[key]
+
+    def Contains(self, obj, key):
+        return key in obj
+
+    def GetAttr(self, obj, attr):
+        return self.wrap(getattr(obj, attr))
+
+    def SetAttr(self, obj, attr, value):
+        setattr(obj, attr, value)
+
+    def HasAttr(self, obj, attr):
+        return hasattr(obj, attr)
+
+    def DelAttr(self, obj, attr):
+        delattr(obj, attr)
+
+    def Eval(self, expr, globals=None, locals=None):
+        return self.wrap(eval(expr, globals, locals))
+
+    def Exec(self, stmt, globals=None, locals=None):
+        exec(stmt, globals, locals)
+
+
+class RequestHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        sock = self.request
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            if recv_message(sock) != self.server.token:
+                return
+            send_message(sock, ('ok', None))
+            dispatcher = self.server.dispatcher_class()
+            while True:
+                request = recv_message(sock)
+                try:
+                    response = ('ok', dispatcher.dispatch(request[0], request[1:]))
+                    out = []
+                    encode(response, out)
+                except Exception as e:
+                    out = []
+                    encode(('error', "%s: %s" % (e.__class__.__name__, e)), out)
+                payload = b''.join(out)
+                sock.sendall(_header.pack(len(payload)) + payload)
+        except (EOFError, socket.error):
+            pass
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """
+    Every connection is served by its own thread and has its own handle table. Clients have to send ``token`` as
+    their first message, as other users of the machine can connect to the port, too.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=('127.0.0.1', 0), token=None, dispatcher_class=Dispatcher):
+        socketserver.TCPServer.__init__(self, address, RequestHandler)
+        self.token = token or binascii.hexlify(os.urandom(16)).decode('ascii')
+        self.dispatcher_class = dispatcher_class
+
+
+def serve(address=('127.0.0.1', 0), token=None, dispatcher_class=Dispatcher):
+    server = Server(address, token, dispatcher_class)
+    print('xlwings transport running, address=%s:%s, token=%s' % (server.server_address + (server.token,)))
+    server.serve_forever()
+
+
+def start_server(address=('127.0.0.1', 0), token=None, dispatcher_class=Dispatcher):
+    """Starts a server in a background thread and returns it, see ``server.server_address`` and ``server.token``."""
+    server = Server(address, token, dispatcher_class)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+class Client(object):
+    """
+    Calls the methods of the server by name, e.g. ``client.GetAttr(handle, 'attr')``. Handles that aren't needed
+    anymore can be released via ``client.Release(handle, ...)``.
+    """
+
+    def __init__(self, address, token):
+        self.sock = socket.create_connection(address)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        send_message(self.sock, token)
+        try:
+            recv_message(self.sock)
+        except EOFError:
+            raise RemoteError("The server rejected the token")
+
+    def call(self, method, *args):
+        send_message(self.sock, [method] + list(args))
+        status, value = recv_message(self.sock)
+        if status == 'error':
+            raise RemoteError(value)
+        return value
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return lambda *args: self.call(name, *args)
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
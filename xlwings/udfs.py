@@ -4,18 +4,29 @@ import re
 import os.path
 import tempfile
 import inspect
+import json
+import pickle
+import hashlib
+from timeit import default_timer
 from importlib import import_module
 
-from win32com.client import Dispatch
+import pythoncom
+import pywintypes
+from win32com.client import Dispatch, WithEvents
 
 from . import conversion
+from .executors import get_process_executor, thread_executor, call_with_timeout, UDFTimeout
+from .profiling import UDFProfiler
+from .streaming import is_stream_function, streams
 from .utils import VBAWriter
 from . import xlplatform
 from . import Range
 
-from . import PY3
+from . import PY3, string_types, __version__
 
 if PY3:
+    from io import StringIO
+    from importlib.util import find_spec
     try:
         from imp import reload
     except:
@@ -43,6 +54,9 @@ if PY3:
         }
 
 else:
+    from StringIO import StringIO
+    import imp
+
     def func_sig(f):
         s = inspect.getargspec(f)
         if s.keywords:
@@ -60,6 +74,7 @@ def xlfunc(f=None, **kwargs):
             xlf = f.__xlfunc__ = {}
             xlf["name"] = f.__name__
             xlf["sub"] = False
+            xlf["options"] = {}
             xlargs = xlf["args"] = []
             xlargmap = xlf["argmap"] = {}
             sig = func_sig(f)
@@ -85,6 +100,12 @@ def xlfunc(f=None, **kwargs):
                 "doc": f.__doc__ if f.__doc__ is not None else "Python function '" + f.__name__ + "' defined in '" + str(f.__code__.co_filename) + "'.",
                 "options": {}
             }
+        xlf = f.__xlfunc__
+        xlf["options"].update(kwargs)
+        if xlf["options"].get("vectorize", False) and any(arg["vararg"] for arg in xlf["args"]):
+            raise Exception("xlwings does not support vectorized UDFs with variable length arguments")
+        if is_stream_function(f) and (xlf["options"].get("vectorize", False) or xlf["options"].get("executor", None)):
+            raise Exception("xlwings does not support generator UDFs with the vectorize or executor options")
         return f
     if f is None:
         return inner
@@ -132,15 +153,113 @@ def xlarg(arg, convert=None, **kwargs):
 
 udf_modules = {}
 
+# Timeout in seconds of the UDFs that run in an executor and don't specify one via @xw.func(timeout=...), None means
+# no timeout. Functions that run on the server's thread are only stopped if they specify a timeout themselves.
+default_timeout = None
+
+# Call statistics of all UDFs, see also the xlwings_udf_stats worksheet function
+profiler = UDFProfiler()
+
+# Returned by vectorized UDFs until the batch they have been queued in has been evaluated
+PENDING = "#N/A Pending"
+
+vectorized_calls = {}
+vectorized_results = {}
+
+
+# caller key -> SpillFingerprint of the last value that has been spilled by a dynamic array formula
+spill_fingerprints = {}
+
+
+def fingerprint(xl_value):
+    """Shape and per-row content hashes of a 2d list as it is written to Excel, ``None`` for any other value."""
+    if not isinstance(xl_value, (list, tuple)) or not all(isinstance(row, (list, tuple)) for row in xl_value):
+        return None
+    shape = (len(xl_value), len(xl_value[0]) if xl_value else 0)
+    rows = [hashlib.md5(repr(row).encode('utf-8')).digest() for row in xl_value]
+    return shape, rows
+
+
+class SpillFingerprint(object):
+    def __init__(self, shape, rows, samples, caller, func_name):
+        self.shape = shape
+        self.rows = rows
+        # the values of a few spilled cells as they were read back after the write
+        self.samples = samples
+        self.caller = caller
+        self.func_name = func_name
+
+
+def prune_spill_fingerprints():
+    """Forgets the spilled values of callers that no longer contain their formula."""
+    for key, entry in list(spill_fingerprints.items()):
+        if not caller_has_formula(entry.caller, entry.func_name):
+            spill_fingerprints.pop(key, None)
+
+
+prune_spill_fingerprints.key = 'prune_spill_fingerprints'
+
 
 class DelayWrite(object):
-    def __init__(self, rng, options, value, caller):
+    def __init__(self, rng, options, value, caller, xl_value=None, func_name=None):
         self.range = rng
         self.options = options
         self.value = value
+        self.xl_value = xl_value
+        self.caller = caller
+        self.func_name = func_name
         self.skip = (caller.Rows.Count, caller.Columns.Count)
+        # a later write from the same caller supersedes this one, writes are batched per sheet
+        self.key = get_caller_key(caller)
+        self.batch = self.key.rsplit('!', 1)[0]
+
+    @property
+    def xl_app(self):
+        return self.caller.Application
 
     def __call__(self, *args, **kwargs):
+        current = fingerprint(self.xl_value)
+        if current is None or self.func_name is None:
+            spill_fingerprints.pop(self.key, None)
+            self.write_all()
+            return
+
+        shape, rows = current
+        previous = spill_fingerprints.get(self.key, None)
+        if previous is None or previous.shape != shape or self.read_samples(shape) != previous.samples:
+            # the spill range may have been cleared or overwritten since the last write
+            self.write_all()
+        elif previous.rows != rows:
+            # same shape: there's nothing to clear and only the rows that changed need to be written
+            changed = [i for i, (a, b) in enumerate(zip(previous.rows, rows)) if a != b]
+            start = changed[0]
+            for i, j in zip(changed, changed[1:] + [None]):
+                if j != i + 1:
+                    self.write_rows(start, i + 1)
+                    start = j
+        spill_fingerprints[self.key] = SpillFingerprint(
+            shape, rows, self.read_samples(shape), self.caller, self.func_name
+        )
+
+        from .server import add_idle_task
+        add_idle_task(prune_spill_fingerprints)
+
+    def read_samples(self, shape):
+        """The values of the first and the last spilled cell, i.e. the cells outside of the formula."""
+        nrows, ncols = shape
+        skip_rows, skip_cols = self.skip
+        if ncols > skip_cols:
+            first = (0, skip_cols)
+        elif nrows > skip_rows:
+            first = (skip_rows, 0)
+        else:
+            return ()
+        return tuple(
+            self.range.offset(row, col).resize(1, 1).raw_value
+            for row, col in (first, (nrows - 1, ncols - 1))
+        )
+
+    def write_all(self):
         conversion.write(
             self.value,
             self.range,
@@ -148,8 +267,368 @@ class DelayWrite(object):
             .override(_skip_tl_cells=self.skip)
         )
 
+    def write_rows(self, start, stop):
+        ncols = len(self.xl_value[0])
+        skip_rows, skip_cols = self.skip
+        if start < skip_rows:
+            # the cells of the formula itself must not be overwritten
+            end = min(stop, skip_rows)
+            if skip_cols < ncols:
+                self.range.offset(start, skip_cols).resize(end - start, ncols - skip_cols).raw_value = [
+                    row[skip_cols:] for row in self.xl_value[start:end]
+                ]
+            start = end
+        if start < stop:
+            self.range.offset(start, 0).resize(stop - start, ncols).raw_value = self.xl_value[start:stop]
+
+
+class VectorizedCall(object):
+    """
+    Task that evaluates all calls of a vectorized UDF during a calculation in a single function call, once the
+    calculation is over. Every argument is handed over as a list with one element per calling cell and the function
+    has to return a sequence of the same length. The callers are then recalculated and pick up their result from
+    ``vectorized_results``.
+    """
+    def __init__(self, module_name, func_name):
+        self.module_name = module_name
+        self.func_name = func_name
+        self.key = ('xlwings.vectorized', module_name, func_name)
+
+    def __call__(self, *args, **kwargs):
+        calls = vectorized_calls.pop((self.module_name, self.func_name), [])
+        if not calls:
+            return
+
+        func = getattr(get_udf_module(self.module_name), self.func_name)
+        n_args = len(calls[0][1])
+        columns = [[call_args[i] for _, call_args, _ in calls] for i in range(n_args)]
+        try:
+            results = list(run_udf(self.module_name, self.func_name, func, columns))
+            if len(results) != len(calls):
+                raise Exception("Vectorized function '%s' returned %s values for %s calls"
+                                % (self.func_name, len(results), len(calls)))
+        except Exception as e:
+            results = [e] * len(calls)
+
+        for (key, _, caller), result in zip(calls, results):
+            vectorized_results[key] = result
+        from .server import add_idle_task
+        add_idle_task(Recalculate([(key, caller) for key, _, caller in calls]))
+
+
+class Recalculate(object):
+    """
+    Idle task that recalculates the callers of a vectorized UDF. If Excel is busy, the task is run again later and
+    continues with the callers that are left.
+    """
+    def __init__(self, callers):
+        self.callers = callers
+
+    def __call__(self, *args, **kwargs):
+        while self.callers:
+            key, caller = self.callers[0]
+            try:
+                caller.Calculate()
+            except Exception as e:
+                if is_busy_error(e):
+                    raise
+                # e.g. the cell has been deleted, so nobody picks up the result
+                vectorized_results.pop(key, None)
+            self.callers.pop(0)
+
+
+class ArgumentCache(object):
+    """
+    Caches range arguments that have been read and converted during the current calculation cycle, so that a range
+    that is passed to many UDFs is only read once. Only ranges without formulas are cached (Excel may call a UDF
+    before its precedents have been calculated). The cache is cleared once the calculation is over (see
+    ``Calculation``) and whenever a sheet of a workbook that has cached values is changed.
+    """
+
+    class WorkbookEvents(object):
+        def OnSheetChange(self, sheet, target):
+            arg_cache.clear()
+
+    def __init__(self):
+        self.values = {}
+        self.workbooks = {}
+
+    def key(self, xl_range, options):
+        address = xl_range.GetAddress(True, True, 1, True)
+        if ':' not in address.split('!')[-1]:
+            # reading a single cell isn't more expensive than checking the cache
+            return None
+        if xl_range.HasFormula is not False:
+            return None
+        try:
+            key = (address, tuple(sorted(options.items())))
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def read(self, xl_range, options):
+        key = self.key(xl_range, options)
+        if key is None:
+            return conversion.read(Range(impl=xlplatform.Range(xl=xl_range)), None, options)
+        try:
+            return self.values[key]
+        except KeyError:
+            pass
+        value = conversion.read(Range(impl=xlplatform.Range(xl=xl_range)), None, options)
+        if not self.values:
+            calculation.after(self.clear)
+        self.values[key] = value
+        self.watch(key[0], xl_range)
+        return value
+
+    def watch(self, address, xl_range):
+        # e.g. [Book1.xlsx]Sheet1!$A$1:$B$2 or '[My Book.xlsx]Sheet 1'!$A$1:$B$2
+        book_part = address.split('!')[0].lstrip("'")
+        book_name = book_part[1:book_part.index(']')]
+        if book_name not in self.workbooks:
+            self.workbooks[book_name] = WithEvents(xl_range.Worksheet.Parent, ArgumentCache.WorkbookEvents)
+
+    def clear(self):
+        self.values.clear()
+
+
+arg_cache = ArgumentCache()
+
+
+class Calculation(object):
+    """
+    Runs tasks once Excel has finished the current calculation, e.g. the tasks that clean up after the UDF calls of
+    a calculation or that evaluate them as a batch. The ``AfterCalculate`` event of every Excel instance that calls
+    UDFs is hooked. Without it (before Excel 2007), the tasks run once no task has been added for ``settle_time``
+    seconds.
+    """
+
+    class AppEvents(object):
+        def OnAfterCalculate(self):
+            calculation.ended()
+
+    class Settled(object):
+        # Idle task that stands in for the AfterCalculate event, delayed again by every task that is added
+        key = 'xlwings.calculation'
+
+        def __call__(self, *args, **kwargs):
+            calculation.ended()
+
+    def __init__(self, settle_time=0.2):
+        self.settle_time = settle_time
+        self.apps = {}
+        self.tasks = {}
+
+    def watch(self, xl_app):
+        hwnd = xl_app.Hwnd
+        if hwnd in self.apps:
+            return
+        events = None
+        if int(re.split("[,\\.]", xl_app.Version)[0]) >= 12:
+            events = WithEvents(xl_app, Calculation.AppEvents)
+        self.apps[hwnd] = events
+
+    def after(self, task):
+        """Runs ``task`` as an idle task once the calculation is over, a pending task with the same key only once."""
+        key = getattr(task, 'key', None)
+        self.tasks[task if key is None else key] = task
+        if not self.apps or None in self.apps.values():
+            from .server import add_idle_task
+            add_idle_task(Calculation.Settled(), delay=self.settle_time)
+
+    def ended(self):
+        if not self.tasks:
+            return
+        from .server import add_idle_task
+        tasks, self.tasks = self.tasks, {}
+        for task in tasks.values():
+            add_idle_task(task)
+
+
+calculation = Calculation()
+
+
+# RPC_E_CALL_REJECTED and RPC_E_SERVERCALL_RETRYLATER: Excel is busy, e.g. calculating or in cell edit mode
+BUSY_HRESULTS = (-2147418111, -2147417846)
+
+
+def is_busy_error(e):
+    return isinstance(e, pywintypes.com_error) and e.hresult in BUSY_HRESULTS
+
+
+def caller_has_formula(caller, func_name):
+    """
+    Returns whether the calling range still contains a formula that calls ``func_name``. Raises the COM error if
+    Excel is busy, as that doesn't say anything about the formula.
+    """
+    try:
+        formula = caller.Cells(1, 1).Formula
+    except pywintypes.com_error as e:
+        if e.hresult in BUSY_HRESULTS:
+            raise
+        # e.g. the sheet or the workbook has been closed
+        return False
+    if not isinstance(formula, string_types):
+        return False
+    # the name of the function must be followed by its argument list, e.g. f( but not f2( or module.f(
+    return re.search(r'(?<![\w.])' + re.escape(func_name) + r'\(', formula, re.IGNORECASE) is not None
+
+
+def args_digest(args):
+    """
+    Digest of the converted arguments of a call. Unlike their ``repr``, which abbreviates large NumPy arrays and
+    DataFrames, it changes whenever any of the values changes.
+    """
+    h = hashlib.sha1()
+    for arg in args:
+        dtype = getattr(arg, 'dtype', None)
+        if dtype is not None and hasattr(arg, 'tobytes') and not dtype.hasobject:
+            h.update(repr((str(dtype), arg.shape)).encode('utf-8'))
+            h.update(arg.tobytes())
+        else:
+            try:
+                h.update(pickle.dumps(arg, 2))
+            except Exception:
+                # e.g. an object that can't be pickled: the stream is kept as long as the same object is passed
+                h.update(repr(('object', id(arg))).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+class ObjectStore(object):
+    """
+    Keeps the Python objects returned by UDFs with ``@xw.ret('object')`` in memory. The calling cell only shows a
+    handle like ``DataFrame<12>@Sheet1!B2`` and UDFs with an ``@xw.arg('x', 'object')`` argument resolve it without
+    any conversion. Every calling cell holds a single object: it is replaced when the cell is recalculated and evicted
+    once the cell doesn't contain the formula anymore, which is checked at the end of every calculation.
+    """
+
+    class Sweep(object):
+        # Idle task that evicts the objects of cells whose formula has been changed or deleted
+        key = 'xlwings.object_store'
+
+        def __call__(self, *args, **kwargs):
+            object_store.sweep()
+
+    def __init__(self):
+        self.objects = {}
+        self.callers = {}
+        self.counter = 0
+
+    def __len__(self):
+        return len(self.objects)
+
+    def put(self, obj, caller, func_name):
+        key = get_caller_key(caller)
+        self.evict(key)
+        self.counter += 1
+        sheet, address = key.rsplit('!', 1)
+        handle = "%s<%s>@%s!%s" % (
+            type(obj).__name__, self.counter, sheet.split(']', 1)[1].rstrip("'"), address.replace('$', '')
+        )
+        self.objects[handle] = obj
+        self.callers[key] = (handle, caller, func_name)
+        calculation.after(ObjectStore.Sweep())
+        return handle
+
+    def get(self, handle):
+        try:
+            return self.objects[handle]
+        except (KeyError, TypeError):
+            raise Exception("Unknown object handle '%s'" % (handle,))
+
+    def evict(self, key):
+        entry = self.callers.pop(key, None)
+        if entry is not None:
+            self.objects.pop(entry[0], None)
+
+    def sweep(self):
+        # if Excel is busy, the COM error is raised and the idle queue runs the sweep again later
+        for key, (handle, caller, func_name) in list(self.callers.items()):
+            if not caller_has_formula(caller, func_name):
+                self.evict(key)
+
+    def clear(self):
+        self.objects.clear()
+        self.callers.clear()
+
+
+object_store = ObjectStore()
+
+
+# (IUnknown, Dispatch) pairs of the workbooks that called a UDF, most recent last
+caller_books = []
+MAX_CALLER_BOOKS = 16
+
+
+def get_caller_book(xl_workbook):
+    """
+    Returns the dynamic dispatch wrapper for the calling workbook. Wrappers are reused across calls as long as Excel
+    passes in the same COM object, which spares the type info lookups of creating a new one for every call.
+    """
+    unknown = xl_workbook.QueryInterface(pythoncom.IID_IUnknown)
+    for i, (known, book) in enumerate(caller_books):
+        if known == unknown:
+            if i != len(caller_books) - 1:
+                caller_books.append(caller_books.pop(i))
+            return book
+    book = Dispatch(xl_workbook)
+    caller_books.append((unknown, book))
+    try:
+        calculation.watch(book.Application)
+    except Exception:
+        # the tasks that wait for the end of the calculation fall back to a timer
+        pass
+    if len(caller_books) > MAX_CALLER_BOOKS:
+        caller_books.pop(0)
+    return book
+
+
+def get_caller_key(caller):
+    return caller.GetAddress(True, True, 1, True)
+
+
+def uses_excel_objects(xlfunc):
+    """Whether Excel objects are passed to the UDF, which can only be used on the server's thread."""
+    return any(
+        arg['vba'] or arg.get('output', False) or arg['options'].get('convert', None) is Range
+        for arg in xlfunc['args']
+    )
+
+
+def run_udf(module_name, func_name, func, args):
+    options = func.__xlfunc__['options']
+    executor = options.get('executor', None)
+    if executor == 'process':
+        from .server import wait_pumping
+        timeout = options.get('timeout', default_timeout)
+        # the worker enforces the timeout itself
+        task = get_process_executor().submit(module_name, func_name, args, timeout)
+        wait_pumping(task)
+        return task.result()
+    elif executor == 'thread':
+        from .server import wait_pumping
+        timeout = options.get('timeout', default_timeout)
+        task = thread_executor.submit(func, args, cancellable=timeout is not None)
+        if not wait_pumping(task, timeout):
+            task.cancel()
+            raise UDFTimeout(func_name, timeout)
+        return task.result()
+    elif executor is None:
+        # the timeout thread isn't the server's thread, so Excel objects and Book.caller() don't work there
+        timeout = options.get('timeout', None)
+        if timeout is None or uses_excel_objects(func.__xlfunc__):
+            return func(*args)
+        return call_with_timeout(func, args, timeout)
+    else:
+        raise ValueError("Invalid executor '%s'" % executor)
+
 
 def get_udf_module(module_name):
+    if module_name == __name__:
+        # the built-in functions like xlwings_udf_stats: xlwings itself is never reloaded
+        return sys.modules[__name__]
     module_info = udf_modules.get(module_name, None)
     if module_info is not None:
         mtime = os.path.getmtime(module_info['filename'])
@@ -178,7 +657,10 @@ def get_udf_module(module_name):
 
 
 def call_udf(module_name, func_name, args, this_workbook, caller):
-
+    """
+    Calls a UDF with the arguments as they are passed by Excel. ``this_workbook`` and ``caller`` are None if the
+    function is called over ``xlwings.transport``, which only passes values.
+    """
     module = get_udf_module(module_name)
 
     func = getattr(module, func_name)
@@ -188,165 +670,446 @@ def call_udf(module_name, func_name, args, this_workbook, caller):
     ret_info = func_info['ret']
 
     writing = func_info.get('writing', None)
-    if writing and writing == caller.Address:
+    if writing and caller is not None and writing == caller.Address:
         return func_info['rval']
 
+    vectorize = func_info['options'].get('vectorize', False)
+    if vectorize and caller is not None:
+        # a cell can call several vectorized UDFs, e.g. =f(A1)+g(A1)
+        caller_key = (module_name, func_name, get_caller_key(caller))
+        if caller_key in vectorized_results:
+            ret = vectorized_results.pop(caller_key)
+            if isinstance(ret, Exception):
+                raise ret
+            return write_result(ret, ret_info, caller, func_name)
+
     output_param_indices = []
 
+    t0 = default_timer()
     args = list(args)
     for i, arg in enumerate(args):
         arg_info = args_info[min(i, len(args_info)-1)]
         if type(arg) is int and arg == -2147352572:      # missing
             args[i] = arg_info.get('optional', None)
+        elif arg_info['options'].get('convert', None) == 'object':
+            args[i] = object_store.get(arg.Value if xlplatform.is_range_instance(arg) else arg)
         elif xlplatform.is_range_instance(arg):
             if arg_info.get('output', False):
                 output_param_indices.append(i)
                 args[i] = OutputParameter(Range(impl=xlplatform.Range(xl=arg)), arg_info['options'], func, caller)
             else:
-                args[i] = conversion.read(Range(impl=xlplatform.Range(xl=arg)), None, arg_info['options'])
+                args[i] = arg_cache.read(arg, arg_info['options'])
         else:
             args[i] = conversion.read(None, arg, arg_info['options'])
 
-    xlplatform.BOOK_CALLER = Dispatch(this_workbook)
-    ret = func(*args)
+    if this_workbook is not None:
+        xlplatform.BOOK_CALLER = get_caller_book(this_workbook)
+
+    if vectorize and caller is not None:
+        vectorized_calls.setdefault((module_name, func_name), []).append((caller_key, args, caller))
+        calculation.after(VectorizedCall(module_name, func_name))
+        return PENDING
+
+    t1 = default_timer()
+    try:
+        if is_stream_function(func):
+            if caller is None:
+                raise Exception("Streaming UDFs can only be called from Excel")
+            ret = streams.get(
+                # a cell can call several streaming UDFs, e.g. =f(A1)+g(A1)
+                (module_name, func_name, get_caller_key(caller)),
+                (module_name, func_name, args_digest(args)),
+                lambda: func(*args),
+                caller,
+                func_name,
+                max_rate=func_info['options'].get('max_rate', None),
+                default=PENDING
+            )
+        elif vectorize:
+            # without a caller there's nothing to batch: a single call with columns of one value
+            ret = list(run_udf(module_name, func_name, func, [[arg] for arg in args]))[0]
+        else:
+            ret = run_udf(module_name, func_name, func, args)
+    except UDFTimeout:
+        profiler.record_timeout(func_name)
+        raise
+    except:
+        profiler.record_error(func_name)
+        raise
+    t2 = default_timer()
+
+    if ret is PENDING:
+        return PENDING
+
+    xl_value = write_result(ret, ret_info, caller, func_name)
+
+    t3 = default_timer()
+    if ret_info['options'].get('convert', None) == 'object':
+        n_cells = 1
+    elif isinstance(xl_value, (list, tuple)):
+        n_cells = len(xl_value) * len(xl_value[0]) if xl_value else 0
+    else:
+        # e.g. a scalar from @xw.ret('raw')
+        n_cells = 1
+    profiler.record(func_name, t1 - t0, t2 - t1, t3 - t2, n_cells)
+
+    return xl_value
 
-    if ret_info['options'].get('expand', None):
+
+def write_result(ret, ret_info, caller, func_name):
+    """Converts the return value of a UDF and queues the write of dynamic arrays."""
+    if ret_info['options'].get('convert', None) == 'object':
+        if caller is None:
+            raise Exception("UDFs that return objects can only be called from Excel")
+        return object_store.put(ret, caller, func_name)
+
+    xl_value = conversion.write(ret, None, ret_info['options'])
+
+    if ret_info['options'].get('expand', None) and caller is not None:
         from .server import add_idle_task
-        add_idle_task(DelayWrite(Range(impl=xlplatform.Range(xl=caller)), ret_info['options'], ret, caller))
+        add_idle_task(DelayWrite(
+            Range(impl=xlplatform.Range(xl=caller)), ret_info['options'], ret, caller, xl_value, func_name
+        ))
+
+    return xl_value
+
+
+@xlfunc
+@xlret(expand='table')
+def xlwings_udf_stats():
+    """Returns call counts and latencies (in milliseconds) of the Python UDFs, slowest first."""
+    return profiler.table()
 
-    return conversion.write(ret, None, ret_info['options'])
 
+VBA_MODULE_HEADER = "'Autogenerated code by xlwings - changes will be lost with next import!\n"
+VBA_HASH_PREFIX = "'xlwings-udf: "
 
-def generate_vba_wrapper(module_name, module, f):
 
+def get_udfs(module):
+    """Returns the ``__xlfunc__`` dicts of all UDFs defined in ``module``."""
+    return [
+        svar.__xlfunc__
+        for svar in map(lambda attr: getattr(module, attr), dir(module))
+        if hasattr(svar, '__xlfunc__')
+    ]
+
+
+def generate_vba_function(module_name, xlfunc, f):
     vba = VBAWriter(f)
 
-    vba.writeln('Attribute VB_Name = "xlwings_udfs"')
-
-    vba.writeln("'Autogenerated code by xlwings - changes will be lost with next import!")
-
-    for svar in map(lambda attr: getattr(module, attr), dir(module)):
-        if hasattr(svar, '__xlfunc__'):
-            xlfunc = svar.__xlfunc__
-            xlret = xlfunc['ret']
-            fname = xlfunc['name']
-
-            ftype = 'Sub' if xlfunc['sub'] else 'Function'
-
-            func_sig = ftype + " " + fname + "("
-
-            first = True
-            vararg = ''
-            n_args = len(xlfunc['args'])
-            for arg in xlfunc['args']:
-                if not arg['vba']:
-                    argname = arg['name']
-                    if not first:
-                        func_sig += ', '
-                    if 'optional' in arg:
-                        func_sig += 'Optional '
-                    elif arg['vararg']:
-                        func_sig += 'ParamArray '
-                        vararg = argname
-                    func_sig += argname
-                    if arg['vararg']:
-                        func_sig += '()'
-                    first = False
-            func_sig += ')'
-
-            with vba.block(func_sig):
-
-                if ftype == 'Function':
-                    vba.write("If TypeOf Application.Caller Is Range Then On Error GoTo failed\n")
-
-                if vararg != '':
-                    vba.write("ReDim argsArray(1 to UBound(" + vararg + ") - LBound(" + vararg + ") + " + str(n_args) + ")\n")
-
-                j = 1
-                for arg in xlfunc['args']:
-                    argname = arg['name']
-                    if arg['vararg']:
-                        vba.write("For k = LBound(" + vararg + ") To UBound(" + vararg + ")\n")
-                        argname = vararg + "(k)"
-
-                    if arg['vararg']:
-                        vba.write("argsArray(" + str(j) + " + k - LBound(" + vararg + ")) = " + argname + "\n")
-                        vba.write("Next k\n")
-                    else:
-                        if vararg != "":
-                            vba.write("argsArray(" + str(j) + ") = " + argname + "\n")
-                            j += 1
-
-                if vararg != '':
-                    args_vba = 'argsArray'
-                else:
-                    args_vba = 'Array(' + ', '.join(arg['vba'] or arg['name'] for arg in xlfunc['args']) + ')'
-
-                if ftype == "Sub":
-                    vba.write('Py.CallUDF "{module_name}", "{fname}", {args_vba}, ThisWorkbook, Application.Caller\n',
-                        module_name=module_name,
-                        fname=fname,
-                        args_vba=args_vba,
-                    )
-                else:
-                    vba.write('{fname} = Py.CallUDF("{module_name}", "{fname}", {args_vba}, ThisWorkbook, Application.Caller)\n',
-                        module_name=module_name,
-                        fname=fname,
-                        args_vba=args_vba,
-                    )
-
-                if ftype == "Function":
-                    vba.write("Exit " + ftype + "\n")
-                    vba.write_label("failed")
-                    vba.write(fname + " = Err.Description\n")
-
-            vba.write('End ' + ftype + "\n")
-            vba.write("\n")
+    fname = xlfunc['name']
 
+    ftype = 'Sub' if xlfunc['sub'] else 'Function'
 
-def import_udfs(module_names, xl_workbook):
-    module_names = module_names.split(';')
+    func_sig = ftype + " " + fname + "("
+
+    first = True
+    vararg = ''
+    n_args = len(xlfunc['args'])
+    for arg in xlfunc['args']:
+        if not arg['vba']:
+            argname = arg['name']
+            if not first:
+                func_sig += ', '
+            if 'optional' in arg:
+                func_sig += 'Optional '
+            elif arg['vararg']:
+                func_sig += 'ParamArray '
+                vararg = argname
+            func_sig += argname
+            if arg['vararg']:
+                func_sig += '()'
+            first = False
+    func_sig += ')'
+
+    with vba.block(func_sig):
+
+        if ftype == 'Function':
+            vba.write("If TypeOf Application.Caller Is Range Then On Error GoTo failed\n")
+
+        if vararg != '':
+            vba.write("ReDim argsArray(1 to UBound(" + vararg + ") - LBound(" + vararg + ") + " + str(n_args) + ")\n")
+
+        j = 1
+        for arg in xlfunc['args']:
+            argname = arg['name']
+            if arg['vararg']:
+                vba.write("For k = LBound(" + vararg + ") To UBound(" + vararg + ")\n")
+                argname = vararg + "(k)"
+
+            if arg['vararg']:
+                vba.write("argsArray(" + str(j) + " + k - LBound(" + vararg + ")) = " + argname + "\n")
+                vba.write("Next k\n")
+            else:
+                if vararg != "":
+                    vba.write("argsArray(" + str(j) + ") = " + argname + "\n")
+                    j += 1
+
+        if vararg != '':
+            args_vba = 'argsArray'
+        else:
+            args_vba = 'Array(' + ', '.join(arg['vba'] or arg['name'] for arg in xlfunc['args']) + ')'
+
+        if ftype == "Sub":
+            vba.write('Py.CallUDF "{module_name}", "{fname}", {args_vba}, ThisWorkbook, Application.Caller\n',
+                module_name=module_name,
+                fname=fname,
+                args_vba=args_vba,
+            )
+        else:
+            vba.write('{fname} = Py.CallUDF("{module_name}", "{fname}", {args_vba}, ThisWorkbook, Application.Caller)\n',
+                module_name=module_name,
+                fname=fname,
+                args_vba=args_vba,
+            )
+
+        if ftype == "Function":
+            vba.write("Exit " + ftype + "\n")
+            vba.write_label("failed")
+            vba.write(fname + " = Err.Description\n")
 
-    tf = tempfile.NamedTemporaryFile(mode='w', delete=False)
+    vba.write('End ' + ftype + "\n")
 
-    for module_name in module_names:
+
+def get_udf_docs(xlfunc):
+    """Returns the function description and argument descriptions as passed to ``Application.MacroOptions``."""
+    return xlfunc['ret']['doc'][:255], [arg['doc'][:255] for arg in xlfunc['args'] if not arg['vba']]
+
+
+def generate_vba_udf(module_name, xlfunc):
+    """
+    Returns the VBA code of a single UDF, preceded by a comment with the hash of its code and docs, which is used to
+    find out which functions have to be updated on the next import. The functions of a module are separated by a
+    blank line, which isn't part of the returned code.
+    """
+    f = StringIO()
+    generate_vba_function(module_name, xlfunc, f)
+    code = f.getvalue()
+
+    fdoc, argdocs = get_udf_docs(xlfunc)
+    h = hashlib.sha1()
+    for s in [code, fdoc] + argdocs:
+        h.update(s if isinstance(s, bytes) else s.encode('utf-8'))
+        h.update(b'\0')
+
+    return VBA_HASH_PREFIX + xlfunc['name'] + " " + h.hexdigest()[:16] + "\n" + code
+
+
+def parse_vba_udfs(code):
+    """
+    Parses the code of an existing xlwings_udfs module and returns a list of ``(name, hash, first_line, n_lines)``
+    tuples, one per function, with 1-based line numbers as used by the VBE's CodeModule.
+    """
+    udfs = []
+    current = None
+    for i, line in enumerate(code.splitlines(), 1):
+        if line.startswith(VBA_HASH_PREFIX):
+            parts = line[len(VBA_HASH_PREFIX):].split()
+            current = [parts[0], parts[1] if len(parts) > 1 else '', i, 0]
+        elif current is not None and (line.startswith('End Function') or line.startswith('End Sub')):
+            current[3] = i - current[2] + 1
+            udfs.append(tuple(current))
+            current = None
+    return udfs
+
+
+def set_udf_macro_options(xl_workbook, xlfunc, excel_version):
+    fdoc, argdocs = get_udf_docs(xlfunc)
+    macro = "'" + xl_workbook.Name + "'!" + xlfunc['name']
+    if argdocs and excel_version >= 14:
+        xl_workbook.Application.MacroOptions(macro, Description=fdoc, ArgumentDescriptions=argdocs)
+    else:
+        xl_workbook.Application.MacroOptions(macro, Description=fdoc)
+
+
+def find_udf_module_file(module_name):
+    """Returns the path of the source file of ``module_name`` without importing it (or None if there's none)."""
+    try:
+        if PY3:
+            spec = find_spec(module_name)
+            filename = spec.origin if spec is not None else None
+        else:
+            if '.' in module_name:
+                # imp can't look into packages without importing them
+                return None
+            f, filename, description = imp.find_module(module_name)
+            if f is not None:
+                f.close()
+    except ImportError:
+        return None
+    if filename and filename.endswith('.py') and os.path.isfile(filename):
+        return filename
+    return None
+
+
+def get_manifest_path(filename):
+    return os.path.splitext(filename)[0] + '.udfs.json'
+
+
+def get_source_hash(filename):
+    with open(filename, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def xlfunc_to_manifest(xlfunc):
+    """
+    Returns the part of ``xlfunc`` that is needed to generate the VBA code, in a form that can be stored as JSON.
+    Options can hold arbitrary objects like converter classes, they are only stored as ``repr`` for information.
+    """
+    args = []
+    for arg in xlfunc['args']:
+        info = {
+            'name': arg['name'],
+            'vba': arg['vba'],
+            'doc': arg['doc'],
+            'vararg': arg['vararg'],
+            'options': dict((k, repr(v)) for k, v in arg['options'].items()),
+        }
+        if 'optional' in arg:
+            info['optional'] = repr(arg['optional'])
+        args.append(info)
+    return {
+        'name': xlfunc['name'],
+        'sub': xlfunc['sub'],
+        'options': dict((k, repr(v)) for k, v in xlfunc['options'].items()),
+        'args': args,
+        'ret': {
+            'doc': xlfunc['ret']['doc'],
+            'options': dict((k, repr(v)) for k, v in xlfunc['ret']['options'].items()),
+        },
+    }
+
+
+def write_udf_manifest(module_name, module=None):
+    """
+    Writes the manifest of a UDF module next to its source file: the name, arguments, options and docs of all its
+    functions together with the hash of the source file. Returns the path of the manifest.
+    """
+    if module is None:
         module = get_udf_module(module_name)
-        generate_vba_wrapper(module_name, module, tf.file)
+    filename = module.__file__
+    if filename.endswith(('.pyc', '.pyo')):
+        filename = filename[:-1]
+    manifest = {
+        'module': module_name,
+        'xlwings': __version__,
+        'hash': get_source_hash(filename),
+        'functions': [xlfunc_to_manifest(xlfunc) for xlfunc in get_udfs(module)],
+    }
+    path = get_manifest_path(filename)
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return path
 
-    tf.close()
 
+def read_udf_manifest(module_name):
+    """
+    Returns the functions of ``module_name`` as stored in its manifest, or None if there's no manifest or if it is
+    out of date.
+    """
+    filename = find_udf_module_file(module_name)
+    if filename is None:
+        return None
+    path = get_manifest_path(filename)
+    if not os.path.isfile(path):
+        return None
     try:
-        xl_workbook.VBProject.VBComponents.Remove(xl_workbook.VBProject.VBComponents("xlwings_udfs"))
-    except:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except ValueError:
+        return None
+    if (manifest.get('module') != module_name or manifest.get('xlwings') != __version__
+            or manifest.get('hash') != get_source_hash(filename)):
+        return None
+    return manifest['functions']
+
+
+def get_udf_infos(module_name):
+    """
+    Returns the ``__xlfunc__`` dicts of all UDFs in ``module_name``. Modules that haven't been imported yet are
+    described by their manifest, if it is up to date, so they are only imported once one of their functions is called.
+    """
+    if module_name not in sys.modules:
+        xlfuncs = read_udf_manifest(module_name)
+        if xlfuncs is not None:
+            return xlfuncs
+    module = get_udf_module(module_name)
+    try:
+        write_udf_manifest(module_name, module)
+    except (IOError, OSError):
+        # e.g. a read-only directory - the manifest is only an optimization
         pass
-    xl_workbook.VBProject.VBComponents.Import(tf.name)
+    return get_udfs(module)
+
+
+def import_udfs(module_names, xl_workbook):
+    udfs = []
+    for module_name in module_names.split(';'):
+        for xlfunc in get_udf_infos(module_name):
+            udfs.append((xlfunc, generate_vba_udf(module_name, xlfunc)))
+
+    # built-in functions, provided by xlwings.udfs itself
+    names = set(xlfunc['name'] for xlfunc, code in udfs)
+    for xlfunc in [xlwings_udf_stats.__xlfunc__]:
+        if xlfunc['name'] not in names:
+            udfs.append((xlfunc, generate_vba_udf(__name__, xlfunc)))
+
+    excel_version = int(re.split("[,\\.]", xl_workbook.Application.Version)[0])
 
-    for module_name in module_names:
-        module = get_udf_module(module_name)
-        for mvar in map(lambda attr: getattr(module, attr), dir(module)):
-            if hasattr(mvar, '__xlfunc__'):
-                xlfunc = mvar.__xlfunc__
-                xlret = xlfunc['ret']
-                xlargs = xlfunc['args']
-                fname = xlfunc['name']
-                fdoc = xlret['doc'][:255]
-                n_args = 0
-                for arg in xlargs:
-                    if not arg['vba']:
-                        n_args += 1
-
-                excel_version = [int(x) for x in re.split("[,\\.]", xl_workbook.Application.Version)]
-                if n_args > 0 and excel_version[0] >= 14:
-                    argdocs = []
-                    for arg in xlargs:
-                        if not arg['vba']:
-                            argdocs.append(arg['doc'][:255])
-                    xl_workbook.Application.MacroOptions("'" + xl_workbook.Name + "'!" + fname, Description=fdoc, ArgumentDescriptions=argdocs)
-                else:
-                    xl_workbook.Application.MacroOptions("'" + xl_workbook.Name + "'!" + fname, Description=fdoc)
-
-    # try to delete the temp file - doesn't matter too much if it fails
     try:
-        os.unlink(tf.name)
+        component = xl_workbook.VBProject.VBComponents("xlwings_udfs")
     except:
-        pass
+        component = None
+
+    existing = []
+    if component is not None:
+        code_module = component.CodeModule
+        if code_module.CountOfLines > 0:
+            existing = parse_vba_udfs(code_module.Lines(1, code_module.CountOfLines))
+
+    if existing:
+        # Update the existing module in place: only the functions whose code or docs changed are replaced
+        new_udfs = dict((xlfunc['name'], (xlfunc, code)) for xlfunc, code in udfs)
+        old_names = set()
+        changed = []
+        # Bottom-up, so that the line numbers of the functions that are still to be processed remain valid
+        for fname, fhash, first_line, n_lines in sorted(existing, key=lambda udf: udf[2], reverse=True):
+            old_names.add(fname)
+            if fname not in new_udfs:
+                # the blank line that separates the function from the next one goes too
+                end = first_line + n_lines
+                if end <= code_module.CountOfLines and not code_module.Lines(end, 1).strip():
+                    n_lines += 1
+                code_module.DeleteLines(first_line, n_lines)
+                continue
+            xlfunc, code = new_udfs[fname]
+            if code.splitlines()[0] != VBA_HASH_PREFIX + fname + " " + fhash:
+                code_module.DeleteLines(first_line, n_lines)
+                code_module.InsertLines(first_line, code.rstrip('\n').replace('\n', '\r\n'))
+                changed.append(xlfunc)
+        for xlfunc, code in udfs:
+            if xlfunc['name'] not in old_names:
+                code_module.AddFromString((code + '\n').replace('\n', '\r\n'))
+                changed.append(xlfunc)
+    else:
+        tf = tempfile.NamedTemporaryFile(mode='w', delete=False)
+        tf.write('Attribute VB_Name = "xlwings_udfs"\n')
+        tf.write(VBA_MODULE_HEADER)
+        for xlfunc, code in udfs:
+            tf.write(code + "\n")
+        tf.close()
+
+        if component is not None:
+            xl_workbook.VBProject.VBComponents.Remove(component)
+        xl_workbook.VBProject.VBComponents.Import(tf.name)
+
+        # try to delete the temp file - doesn't matter too much if it fails
+        try:
+            os.unlink(tf.name)
+        except:
+            pass
+
+        changed = [xlfunc for xlfunc, code in udfs]
+
+    for xlfunc in changed:
+        set_udf_macro_options(xl_workbook, xlfunc, excel_version)
@@ -1,5 +1,16 @@
 from __future__ import division
+import re
+import math
+import numbers
+import unicodedata
+import multiprocessing
+import hashlib
+import atexit
+import pickle
 import datetime as dt
+from io import BytesIO
+from fractions import Fraction
+from contextlib import contextmanager
 
 from functools import total_ordering
 
@@ -65,6 +76,43 @@ def col_name(i):
         raise IndexError(i)
 
 
+def col_index(name):
+    i = 0
+    for c in name.upper():
+        i = i * 26 + ALPHABET.index(c) + 1
+    return i
+
+
+def cell_address(row, col):
+    """Returns the absolute A1 address of a cell, e.g. ``$B$3`` for ``(3, 2)``."""
+    if row < 1:
+        raise IndexError(row)
+    return '$%s$%s' % (col_name(col), row)
+
+
+A1_REFERENCE = re.compile(r'^\$?([A-Z]{1,3})\$?([0-9]+)(?::\$?([A-Z]{1,3})\$?([0-9]+))?$', re.IGNORECASE)
+
+
+def address_to_coords(address):
+    """
+    Returns ``(row, col, nrows, ncols)`` of a single area A1 reference like ``$A$1:$B$2`` or None for anything else,
+    e.g. names, entire rows or columns and references with several areas. Columns beyond ``XFD`` return None too as
+    strings like ``XFE1`` can be defined names.
+    """
+    m = A1_REFERENCE.match(address)
+    if m is None:
+        return None
+    col1, row1, col2, row2 = m.groups()
+    row1, col1 = int(row1), col_index(col1)
+    if col2 is None:
+        row2, col2 = row1, col1
+    else:
+        row2, col2 = int(row2), col_index(col2)
+    if max(col1, col2) > 16384:
+        return None
+    return min(row1, row2), min(col1, col2), abs(row2 - row1) + 1, abs(col2 - col1) + 1
+
+
 class VBAWriter(object):
 
     class Block(object):
@@ -168,16 +216,17 @@ class VersionNumber(object):
 
 
 def process_image(image, width, height):
-
+    """
+    Returns ``(filename, data, width, height)``: Matplotlib figures are rendered to PNG data in memory and have no
+    filename, files are returned by their filename and without data.
+    """
     if isinstance(image, string_types):
-        return image, width, height
+        return image, None, width, height
     elif mpl and isinstance(image, mpl.figure.Figure):
-        temp_dir = os.path.realpath(tempfile.gettempdir())
-        filename = os.path.join(temp_dir, 'xlwings_plot.png')
-
         canvas = mpl.backends.backend_agg.FigureCanvas(image)
         canvas.draw()
-        image.savefig(filename, format='png', bbox_inches='tight')
+        buf = BytesIO()
+        image.savefig(buf, format='png', bbox_inches='tight')
 
         if width is None:
             width = image.bbox.bounds[2:][0]
@@ -185,6 +234,254 @@ def process_image(image, width, height):
         if height is None:
             height = image.bbox.bounds[2:][1]
 
-        return filename, width, height
+        return None, buf.getvalue(), width, height
+    else:
+        raise TypeError("Don't know what to do with that image object")
+
+
+def _use_agg():
+    # Initializes the worker processes of render_figures
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _render_figure(image):
+    if not isinstance(image, mpl.figure.Figure):
+        image = image()
+    _, data, width, height = process_image(image, None, None)
+    return data, width, height
+
+
+def render_figures(images, processes=None):
+    """
+    Renders Matplotlib figures or functions that return one to PNG data in a pool of processes and returns a list of
+    ``(data, width, height)``. The pool is kept for the next call. With a single image, ``processes=1``, inside a
+    worker process or if the images can't be sent to the pool, they are rendered in this process.
+    """
+    if processes == 1 or len(images) < 2 or multiprocessing.current_process().name != 'MainProcess':
+        return [_render_figure(image) for image in images]
+    try:
+        pool = get_render_pool(processes or multiprocessing.cpu_count())
+        return pool.map(_render_figure, images)
+    except (pickle.PicklingError, OSError, RuntimeError):
+        return [_render_figure(image) for image in images]
+
+
+# (number of processes, pool) of render_figures, started on first use as every worker has to import matplotlib
+_render_pool = (None, None)
+
+
+def get_render_pool(processes):
+    global _render_pool
+    n, pool = _render_pool
+    if pool is None or n != processes:
+        close_render_pool()
+        pool = multiprocessing.Pool(processes, initializer=_use_agg)
+        _render_pool = processes, pool
+    return pool
+
+
+@atexit.register
+def close_render_pool():
+    global _render_pool
+    n, pool = _render_pool
+    _render_pool = (None, None)
+    if pool is not None:
+        pool.terminate()
+        pool.join()
+
+
+def get_image_digest(filename, data):
+    if data is None:
+        with open(filename, 'rb') as f:
+            data = f.read()
+    return hashlib.sha1(data).hexdigest()
+
+
+@contextmanager
+def image_file(filename, data, remove=True):
+    """
+    Excel only adds pictures from files: yields the filename or the name of a temporary file with the data that is
+    removed afterwards unless ``remove`` is False. Every call gets its own file, so concurrent calls don't overwrite
+    each other's pictures.
+    """
+    if data is None:
+        yield filename
+        return
+    fd, filename = tempfile.mkstemp(prefix='xlwings-', suffix='.png')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        yield filename
+    finally:
+        if remove:
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+
+
+# Widths in pixels of the printable ASCII characters in Calibri 11, Excel's default font, at 96 dpi. Column widths
+# are measured in widths of '0', which is 7 pixels.
+_PIXEL_WIDTHS = {
+    3: " '.,ilI",
+    4: "!():;[]{}`fjt-|",
+    5: '"Jr',
+    6: "/\\?csz",
+    7: "0123456789#$*+<=>^_~aegkvxy",
+    8: "bdhnopquELSTYZ",
+    9: "ABFKPRVX",
+    10: "%&CDGHNU",
+    11: "OQw",
+    12: "m",
+    13: "@",
+    14: "M",
+    15: "W",
+}
+ZERO_WIDTH = 7.
+CHAR_WIDTHS = dict((c, width / ZERO_WIDTH) for width, chars in _PIXEL_WIDTHS.items() for c in chars)
+
+# Space that AutoFit adds to the widest text of a column, in widths of '0'
+AUTOFIT_PADDING = 0.71
+
+_char_width_table = []
+
+try:
+    unichr
+except NameError:
+    unichr = chr
+
+
+def get_char_width(c):
+    width = CHAR_WIDTHS.get(c, None)
+    if width is None:
+        # Characters that aren't in the table are about as wide as a digit, East Asian ones twice as wide
+        width = 2. if unicodedata.east_asian_width(c) in ('W', 'F') else 1.
+    return width
+
+
+def get_text_widths(texts):
+    """Returns the estimated widths of strings when displayed in the default font, in widths of '0'."""
+    if np is None or not texts:
+        return [sum(get_char_width(c) for c in text) for text in texts]
+    codes = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype=np.uint32)
+    lengths = np.array([len(text) for text in texts])
+    if len(codes) != lengths.sum():
+        # Surrogate pairs of narrow Python 2 builds
+        return [sum(get_char_width(c) for c in text) for text in texts]
+    if not _char_width_table:
+        _char_width_table.append(np.array([get_char_width(unichr(i)) for i in range(0x10000)]))
+    widths = _char_width_table[0][np.minimum(codes, 0xffff)]
+    cumulative = np.concatenate(([0.], np.cumsum(widths)))
+    ends = np.cumsum(lengths)
+    return (cumulative[ends] - cumulative[ends - lengths]).tolist()
+
+
+def split_number_format(number_format):
+    """
+    Returns the text of the first section of a number format without colors, conditions, quotes and escape
+    characters and its codes without any literal text.
+    """
+    section = re.sub(r'\[[^\]]*\]', '', (number_format or 'General').split(';')[0])
+    text = re.sub(r'[_*].|["\\]', '', section)
+    codes = re.sub(r'"[^"]*"|\\.|[_*].', '', section)
+    return text, codes
+
+
+def format_value(value, number_format=None):
+    """
+    Returns roughly the text that Excel displays for a value, used to estimate the width of a column. Only the first
+    section of ``number_format`` is looked at and locale specific formats are ignored.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, string_types):
+        return value
+    text, codes = split_number_format(number_format)
+    is_general = codes in ('General', '@', '')
+    is_date_format = not is_general and re.search('[dmyhs]', codes, re.I) is not None
+    if is_date_format and isinstance(value, (numbers.Number, dt.date)):
+        # Dates and times are about as long as their format
+        return text
+    if isinstance(value, dt.datetime):
+        return value.strftime('%Y-%m-%d %H:%M' if value.time() != dt.time() else '%Y-%m-%d')
+    if isinstance(value, dt.date):
+        return value.strftime('%Y-%m-%d')
+    if not isinstance(value, numbers.Real) or math.isnan(value) or math.isinf(value):
+        return str(value)
+    if is_general:
+        if value == int(value) and abs(value) < 1e11:
+            return '%d' % value
+        # General shows at most 11 characters
+        return '%.10g' % value
+    if '%' in codes:
+        value *= 100
+    m = SCIENTIFIC_CODES.search(codes)
+    if m is not None:
+        return format_scientific(value, m) + re.sub(r'[0#?,.]', '', SCIENTIFIC_CODES.sub('', text, 1))
+    m = FRACTION_CODES.search(codes)
+    if m is not None:
+        return format_fraction(value, m) + re.sub(r'[0#?,.]', '', FRACTION_CODES.sub('', text, 1))
+    decimals = re.search(r'\.([0#?]*)', codes)
+    decimals = len(decimals.group(1)) if decimals else 0
+    number = (('{0:,.%df}' if ',' in codes else '{0:.%df}') % decimals).format(value)
+    return number + re.sub(r'[0#?,.]', '', text)
+
+
+# Mantissa, sign and exponent of scientific formats like 0.00E+00
+SCIENTIFIC_CODES = re.compile(r'([0#?,]*(?:\.[0#?]*)?)[Ee]([+-])([0#?]+)')
+
+# Integer part, numerator and denominator of fraction formats like # ?/? or # ??/16
+FRACTION_CODES = re.compile(r'(?:([0#?,]+) +)?([0#?]+)/([0#?]+|[1-9][0-9]*)')
+
+
+def format_scientific(value, m):
+    decimals = re.search(r'\.([0#?]*)', m.group(1))
+    decimals = len(decimals.group(1)) if decimals else 0
+    mantissa, exponent = ('%.*e' % (decimals, value)).split('e')
+    exponent = int(exponent)
+    sign = '-' if exponent < 0 else ('+' if m.group(2) == '+' else '')
+    return '%sE%s%0*d' % (mantissa, sign, len(m.group(3)), abs(exponent))
+
+
+def format_fraction(value, m):
+    integer_codes, numerator_codes, denominator_codes = m.groups()
+    sign = '-' if value < 0 else ''
+    value = abs(value)
+    integer = int(value) if integer_codes else 0
+    value -= integer
+    if denominator_codes.isdigit():
+        denominator = int(denominator_codes)
+        numerator = int(round(value * denominator))
+    else:
+        fraction = Fraction(value).limit_denominator(10 ** len(denominator_codes) - 1)
+        numerator, denominator = fraction.numerator, fraction.denominator
+    if integer_codes and numerator == denominator:
+        integer, numerator = integer + 1, 0
+    if numerator:
+        fraction = '%*d/%-*d' % (len(numerator_codes), numerator, len(denominator_codes), denominator)
     else:
-        raise TypeError("Don't know what to do with that image object")
\ No newline at end of file
+        # Whole numbers are padded with spaces where the fraction would be
+        fraction = ' ' * (len(numerator_codes) + len(denominator_codes) + 1)
+    if not integer_codes:
+        return sign + fraction
+    return sign + ('%d' % integer if integer or not numerator else '') + ' ' + fraction
+
+
+def estimate_column_width(values, number_format=None):
+    """
+    Returns the column width that AutoFit would roughly set for a column with the given values or None if all of
+    them are empty.
+    """
+    texts = []
+    for value in values:
+        text = format_value(value, number_format)
+        if text:
+            texts.extend(text.splitlines())
+    if not texts:
+        return None
+    width = max(get_text_widths(texts)) + AUTOFIT_PADDING
+    # Column widths are set in whole pixels
+    return min(math.ceil(width * ZERO_WIDTH) / ZERO_WIDTH, 255.)